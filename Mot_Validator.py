@@ -0,0 +1,265 @@
+"""
+Capcom Outbreak .mot validator (no Blender needed).
+
+Checks one or many .mot files against the layout the importer expects:
+  - section headers with type 0x80000002 and h_size inside the file
+  - section byte (h_count & 0xFF) one of 0x0A/0x0C/0x06/0x04 and the
+    declared node count actually present in the section
+  - node n_size = 12 + sum(t_size), n_type flags = OR of the track ids
+  - track t_size = 12 + t_keys * key size, known format (0x11/0x12/0x22)
+  - frames strictly increasing inside each track
+  - int16 values/tangents pinned at the clamp limits (-32768/32767)
+
+Files are streamed: only headers and one track payload at a time are
+read. Directories are scanned recursively and files are checked in
+parallel.
+
+Usage:
+  python Mot_Validator.py file_or_dir [...] [--jobs N] [--json]
+
+Exit code is 1 if any file has errors.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from motbreak import mot_codec
+
+KNOWN_SECTIONS = {0x0A: "LOWER", 0x0C: "UPPER", 0x06: "FACE", 0x04: "HANDS"}
+KNOWN_FORMATS = (mot_codec.FORMAT_LINEAR_16, mot_codec.FORMAT_HERMITE_16, mot_codec.FORMAT_HERMITE_FLOAT)
+INT16_LIMITS = (-32768, 32767)
+
+
+class _Report:
+    def __init__(self, path):
+        self.path = path
+        self.issues = []
+        self.sections = 0
+        self.nodes = 0
+        self.tracks = 0
+        self.keys = 0
+
+    def error(self, code, offset, msg):
+        self.issues.append({"level": "error", "code": code, "offset": offset, "msg": msg})
+
+    def warning(self, code, offset, msg):
+        self.issues.append({"level": "warning", "code": code, "offset": offset, "msg": msg})
+
+    def as_dict(self):
+        errors = sum(1 for i in self.issues if i["level"] == "error")
+        return {
+            "path": self.path,
+            "ok": errors == 0,
+            "errors": errors,
+            "warnings": len(self.issues) - errors,
+            "sections": self.sections,
+            "nodes": self.nodes,
+            "tracks": self.tracks,
+            "keys": self.keys,
+            "issues": self.issues,
+        }
+
+
+def _read(f, offset, st):
+    f.seek(offset)
+    data = f.read(st.size)
+    if len(data) < st.size:
+        return None
+    return st.unpack(data)
+
+
+def _check_keys(report, f, track_ptr, node_name, label, format_type, t_keys):
+    """Legge il payload di un solo track e controlla frame e clamp."""
+    f.seek(track_ptr + mot_codec.TRACK_HEADER.size)
+    data = f.read(t_keys * mot_codec.key_size(format_type))
+    track = mot_codec.Track(mot_codec.TRACK_ACTIVE | (format_type << 16), len(data) // mot_codec.key_size(format_type), data=data)
+    keys = track.keys()
+    report.keys += len(keys)
+
+    prev = None
+    for k, (val, frame, c0, c1) in enumerate(keys):
+        if prev is not None and frame <= prev:
+            report.error("frames_not_monotonic", track_ptr,
+                         f"{node_name} {label}: key {k} frame {frame} <= previous {prev}")
+            break
+        prev = frame
+
+    if format_type == mot_codec.FORMAT_HERMITE_FLOAT:
+        return
+    pinned = [k[1] for k in keys if k[0] in INT16_LIMITS]
+    if pinned:
+        report.warning("value_clamped", track_ptr,
+                       f"{node_name} {label}: {len(pinned)} value(s) at int16 limit (frames {pinned[:10]})")
+    pinned = [k[1] for k in keys if k[2] in INT16_LIMITS or k[3] in INT16_LIMITS]
+    if pinned and format_type == mot_codec.FORMAT_HERMITE_16:
+        report.warning("tangent_clamped", track_ptr,
+                       f"{node_name} {label}: {len(pinned)} tangent(s) at int16 limit (frames {pinned[:10]})")
+
+
+def validate_file(path):
+    """Valida un file .mot; ritorna un dict (serializzabile in JSON)."""
+    report = _Report(path)
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            _validate_stream(report, f, file_size)
+    except OSError as e:
+        report.error("io_error", 0, str(e))
+    return report.as_dict()
+
+
+def _validate_stream(report, f, file_size):
+    offset = 0
+    node_idx = 0
+    hands_count = 0
+    if file_size < mot_codec.SECTION_HEADER.size:
+        report.error("file_too_small", 0, f"{file_size} bytes, no section header")
+        return
+
+    while offset + mot_codec.SECTION_HEADER.size <= file_size:
+        h_type, h_count, h_size, h_loop, h_loopFrame = _read(f, offset, mot_codec.SECTION_HEADER)
+        if h_type != mot_codec.SECTION_TYPE:
+            report.error("bad_section_type", offset, f"h_type 0x{h_type:08X} != 0x{mot_codec.SECTION_TYPE:08X}")
+        if h_size == 0 or offset + h_size > file_size:
+            report.error("bad_section_size", offset, f"h_size {h_size} exceeds file size {file_size}")
+            return
+        report.sections += 1
+
+        section_byte = h_count & 0xFF
+        if section_byte not in KNOWN_SECTIONS:
+            report.error("unknown_section", offset, f"section byte 0x{section_byte:02X}")
+        elif section_byte == 0x04:
+            if hands_count < len(mot_codec.HANDS_FIRST_NODES):
+                node_idx = mot_codec.HANDS_FIRST_NODES[hands_count]
+            hands_count += 1
+        else:
+            node_idx = mot_codec.SECTION_LAYOUT[section_byte][1]
+        if h_loop not in (0, 1):
+            report.warning("bad_loop_flag", offset, f"h_loop {h_loop}")
+
+        section_end = offset + h_size
+        node_ptr = offset + mot_codec.SECTION_HEADER.size
+        found = 0
+        for _ in range(h_count):
+            if node_ptr + mot_codec.NODE_HEADER.size > section_end:
+                break
+            node_ptr = _validate_node(report, f, node_ptr, section_end, node_idx)
+            found += 1
+            node_idx += 1
+            if node_ptr is None:
+                return
+        if found != h_count:
+            report.error("node_count_mismatch", offset,
+                         f"section 0x{section_byte:02X} declares {h_count} nodes, {found} fit in h_size")
+        elif node_ptr != section_end:
+            report.warning("section_size_mismatch", offset,
+                           f"nodes end at 0x{node_ptr:08X}, section ends at 0x{section_end:08X}")
+        offset = section_end
+
+    if offset != file_size:
+        report.warning("trailing_bytes", offset, f"{file_size - offset} byte(s) after the last section")
+
+
+def _validate_node(report, f, node_ptr, section_end, node_idx):
+    node_name = f"Node{node_idx}"
+    n_type, n_sub, n_size = _read(f, node_ptr, mot_codec.NODE_HEADER)
+    report.nodes += 1
+    if n_type < mot_codec.NODE_ACTIVE:
+        report.warning("invalid_node", node_ptr, f"{node_name}: n_type 0x{n_type:08X} (skipped by the importer)")
+        return node_ptr + mot_codec.INVALID_NODE.size
+    node_end = node_ptr + n_size
+    if node_end > section_end:
+        report.error("node_overflow", node_ptr, f"{node_name}: n_size {n_size} goes past the section end")
+        return None
+
+    track_ptr = node_ptr + mot_codec.NODE_HEADER.size
+    flags = 0
+    for s in range(n_sub):
+        header = _read(f, track_ptr, mot_codec.TRACK_HEADER) if track_ptr + 12 <= node_end else None
+        if header is None:
+            report.error("track_overflow", track_ptr, f"{node_name}: track {s} header past node end")
+            return None
+        t_type, t_keys, t_size = header
+        report.tracks += 1
+        format_type = (t_type >> 16) & 0xFF
+        track_id = t_type & 0xFFF
+        flags |= track_id
+        label = mot_codec.TRACK_TYPES.get(track_id, (f"0x{track_id:03X}",))[0]
+
+        if track_id not in mot_codec.TRACK_TYPES:
+            report.warning("unknown_track", track_ptr, f"{node_name}: track id 0x{track_id:03X}")
+        if format_type not in KNOWN_FORMATS:
+            report.error("unknown_format", track_ptr, f"{node_name} {label}: format 0x{format_type:02X}")
+        expected = mot_codec.TRACK_HEADER.size + t_keys * mot_codec.key_size(format_type)
+        if t_size != expected:
+            report.error("track_size_mismatch", track_ptr,
+                         f"{node_name} {label}: t_size {t_size} != 12 + {t_keys} keys * {mot_codec.key_size(format_type)}")
+        if t_size < mot_codec.TRACK_HEADER.size or track_ptr + t_size > node_end:
+            report.error("track_overflow", track_ptr, f"{node_name} {label}: t_size {t_size} goes past the node end")
+            return None
+        if format_type in KNOWN_FORMATS and t_keys:
+            _check_keys(report, f, track_ptr, node_name, label, format_type, min(t_keys, (t_size - 12) // mot_codec.key_size(format_type)))
+        track_ptr += t_size
+
+    if track_ptr != node_end:
+        report.error("node_size_mismatch", node_ptr, f"{node_name}: n_size {n_size} != 12 + sum(t_size) {track_ptr - node_ptr}")
+    if n_sub and (n_type & 0xFFF) != flags:
+        report.warning("node_flags_mismatch", node_ptr,
+                       f"{node_name}: n_type flags 0x{n_type & 0xFFF:03X} != tracks 0x{flags:03X}")
+    return node_end
+
+
+def collect_files(paths):
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            for root, _, names in os.walk(p):
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(".mot"))
+        else:
+            files.append(p)
+    return files
+
+
+def validate_many(files, jobs=None):
+    if jobs == 1 or len(files) < 2:
+        return [validate_file(p) for p in files]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(validate_file, files, chunksize=16))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate Capcom Outbreak .mot files")
+    parser.add_argument("paths", nargs="+", help=".mot files or folders")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="print a JSON summary instead of text")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths)
+    results = validate_many(files, args.jobs)
+    summary = {
+        "files": len(results),
+        "ok": sum(1 for r in results if r["ok"]),
+        "failed": sum(1 for r in results if not r["ok"]),
+        "errors": sum(r["errors"] for r in results),
+        "warnings": sum(r["warnings"] for r in results),
+        "results": results,
+    }
+
+    if args.json:
+        json.dump(summary, sys.stdout, indent=1)
+        print()
+    else:
+        for r in results:
+            status = "OK  " if r["ok"] else "FAIL"
+            print(f"{status} {r['path']} | sections={r['sections']} nodes={r['nodes']} tracks={r['tracks']} keys={r['keys']} | errors={r['errors']} warnings={r['warnings']}")
+            for i in r["issues"]:
+                print(f"     {i['level'].upper():7} 0x{i['offset']:08X} {i['code']}: {i['msg']}")
+        print("-" * 60)
+        print(f"{summary['files']} file(s): {summary['ok']} ok, {summary['failed']} failed, {summary['errors']} error(s), {summary['warnings']} warning(s)")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,9 +9,12 @@ bl_info = {
 }
 
 import bpy
-import struct
 from bpy_extras.io_utils import ImportHelper
 
+# Layout .mot dal codec dell'add-on Mot-Break (cartella motbreak/
+# installata come add-on)
+from motbreak import mot_codec
+
 def apply_capcom_logic_v14(filepath):
     print("\n" + "="*60)
     print(f"IMPORTING: {filepath}")
@@ -40,137 +43,80 @@ def apply_capcom_logic_v14(filepath):
             if node.animation_data:
                 node.animation_data_clear()
     
-    track_types = {
-        0x001: ("SCL_X", "scale", 0),
-        0x002: ("SCL_Y", "scale", 1),
-        0x004: ("SCL_Z", "scale", 2),
-        0x008: ("ROT_X", "rotation_euler", 0),
-        0x010: ("ROT_Y", "rotation_euler", 1),
-        0x020: ("ROT_Z", "rotation_euler", 2),
-        0x040: ("LOC_X", "location", 0),
-        0x080: ("LOC_Y", "location", 1),
-        0x100: ("LOC_Z", "location", 2),
-    }
+    track_types = mot_codec.TRACK_TYPES
 
     try:
-        with open(filepath, "rb") as f:
-            f.seek(0, 2)
-            file_size = f.tell()
-            current_section_offset = 0
-            global_node_idx = 0
+        mot = mot_codec.load(filepath)
+        
+        for section in mot.sections:
+            section_byte = section.section_byte
+            print(f"\n>> SECTION 0x{section_byte:02X} (Nodes: {section.h_count})")
 
-            while current_section_offset + 20 <= file_size:
-                f.seek(current_section_offset)
-                h_data = f.read(20)
-                h_type, h_count, h_size, h_loop, h_loopFrame = struct.unpack("<IIIIf", h_data)
-                
-                if h_size == 0 or h_size > file_size:
-                    break
-                
-                section_byte = h_count & 0xFF
-                if section_byte == 0x0A: global_node_idx = 0
-                elif section_byte == 0x0C: global_node_idx = 10
-                elif section_byte == 0x06: global_node_idx = 22
+            for node in section.nodes:
+                node_name = node.name
                 
-                print(f"\n>> SECTION 0x{section_byte:02X} (Nodes: {h_count})")
-
-                current_node_offset = current_section_offset + 20
-                section_end = current_section_offset + h_size
-
-                for n in range(h_count):
-                    if current_node_offset + 12 > section_end: 
-                        break
-                    f.seek(current_node_offset)
-                    n_type, n_sub, n_size = struct.unpack("<III", f.read(12))
-                    
-                    node_name = f"Node{global_node_idx}"
-                    
-                    # LOG: Inizio elaborazione nodo
-                    status = "ACTIVE" if n_type >= 0x80000000 else "EMPTY"
-                    print(f"   [{status}] {node_name} | Tracks to process: {n_sub}")
+                # LOG: Inizio elaborazione nodo
+                status = "ACTIVE" if node.active else "EMPTY"
+                print(f"   [{status}] {node_name} | Tracks to process: {node.n_sub}")
 
-                    if n_type < 0x80000000:
-                        current_node_offset += 4
-                        global_node_idx += 1
-                        continue
+                if not node.active:
+                    continue
+                
+                target = None
+                if arm and arm.name == node_name: 
+                    target = arm
+                elif arm and arm.type == 'ARMATURE': 
+                    target = arm.pose.bones.get(node_name)
+                if not target: 
+                    target = bpy.data.objects.get(node_name)
+
+                if node.n_sub > 0:
+                    if target:
+                        target.rotation_mode = 'XYZ'
                     
-                    target = None
-                    if arm and arm.name == node_name: 
-                        target = arm
-                    elif arm and arm.type == 'ARMATURE': 
-                        target = arm.pose.bones.get(node_name)
-                    if not target: 
-                        target = bpy.data.objects.get(node_name)
-
-                    if n_sub > 0:
-                        if target:
-                            target.rotation_mode = 'XYZ'
+                    for track in node.tracks:
+                        format_type = track.format_type
+                        track_type = track.track_id
                         
-                        track_ptr = current_node_offset + 12
-                        for s in range(n_sub):
-                            f.seek(track_ptr)
-                            t_type, t_keys, t_size = struct.unpack("<III", f.read(12))
-                            format_type = (t_type >> 16) & 0xFF
-                            track_type = t_type & 0xFFF
+                        if track_type in track_types:
+                            label, prop, idx = track_types[track_type]
                             
-                            if track_type in track_types:
-                                label, prop, idx = track_types[track_type]
-                                
-                                # LOG: Operazione trovata
-                                print(f"      -> Op: {label} | Format: {format_type} | Keys: {t_keys}")
-                                
-                                is_facial = 23 <= global_node_idx <= 26
-                                if is_facial and prop == "location":
-                                    div = FACE_PRECISION
-                                    mult = -1.0
-                                elif prop == "scale":
-                                    div = SCL_PRECISION
-                                    mult = 1.0
-                                elif prop == "location":
-                                    div = LOC_PRECISION
-                                    mult = 1.0
-                                else: 
-                                    div = ROT_PRECISION
-                                    mult = 1.0
-                                
-                                if target:
-                                    keyframe_size = 16 if format_type == 0x22 else (8 if format_type == 0x12 else 4)
-                                    
-                                    for k in range(t_keys):
-                                        f.seek(track_ptr + 12 + (k * keyframe_size))
-                                        
-                                        if format_type == 0x11:
-                                            val, frame = struct.unpack("<hh", f.read(4))
-                                            f_val = (val / div) * mult
-                                        elif format_type == 0x12:
-                                            val, frame, c0, c1 = struct.unpack("<hhhh", f.read(8))
-                                            f_val = (val / div) * mult
-                                        elif format_type == 0x22:
-                                            val_f, frame_f, c0, c1 = struct.unpack("<ffff", f.read(16))
-                                            frame = int(frame_f)
-                                            f_val = val_f * mult
-                                        else:
-                                            val, frame = struct.unpack("<hh", f.read(4))
-                                            f_val = (val / div) * mult
-
-                                        # DEBUG ORIGINALE: Log Y al frame 0
-                                        if label == "LOC_Y" and frame == 0:
-                                            print(f"         [DEBUG] {node_name} LOC_Y Frame 0: {f_val:.4f}")
-
-                                        if prop == "location": 
-                                            target.location[idx] = f_val
-                                        elif prop == "scale": 
-                                            target.scale[idx] = f_val
-                                        else: 
-                                            target.rotation_euler[idx] = f_val
-                                        target.keyframe_insert(data_path=prop, index=idx, frame=frame)
+                            # LOG: Operazione trovata
+                            print(f"      -> Op: {label} | Format: {format_type} | Keys: {track.t_keys}")
                             
-                            track_ptr += t_size
-                    
-                    current_node_offset += n_size
-                    global_node_idx += 1
-                    
-                current_section_offset += h_size
+                            is_facial = 23 <= node.index <= 26
+                            if is_facial and prop == "location":
+                                div = FACE_PRECISION
+                                mult = -1.0
+                            elif prop == "scale":
+                                div = SCL_PRECISION
+                                mult = 1.0
+                            elif prop == "location":
+                                div = LOC_PRECISION
+                                mult = 1.0
+                            else: 
+                                div = ROT_PRECISION
+                                mult = 1.0
+                            
+                            if target:
+                                for val, frame, c0, c1 in track.keys():
+                                    if format_type == mot_codec.FORMAT_HERMITE_FLOAT:
+                                        frame = int(frame)
+                                        f_val = val * mult
+                                    else:
+                                        f_val = (val / div) * mult
+
+                                    # DEBUG ORIGINALE: Log Y al frame 0
+                                    if label == "LOC_Y" and frame == 0:
+                                        print(f"         [DEBUG] {node_name} LOC_Y Frame 0: {f_val:.4f}")
+
+                                    if prop == "location": 
+                                        target.location[idx] = f_val
+                                    elif prop == "scale": 
+                                        target.scale[idx] = f_val
+                                    else: 
+                                        target.rotation_euler[idx] = f_val
+                                    target.keyframe_insert(data_path=prop, index=idx, frame=frame)
         
         print("\n" + "="*60)
         print("IMPORT COMPLETED SUCCESSFULLY")
@@ -0,0 +1,188 @@
+"""
+Columnar NumPy archive for .mot animations (no bpy, needs numpy).
+
+One array per node/channel, named "<node>.<channel>.<field>", e.g.
+"Node3.ROT_X.value". Fields:
+  frame                       frames as stored (int16, float32 for 0x22)
+  value_raw, c0_raw, c1_raw   values/tangents as stored (int16, float32 for 0x22)
+  value, c0, c1               scaled floats, as the importer reads them
+                              (value / div; tangents / div = slope per frame)
+Layout tables (sections, nodes, tracks), the extra bytes blob and the
+loop metadata (loop, loop_frame) make the conversion lossless: the .mot
+rebuilt from the archive is byte-identical to the original.
+
+A path ending in .npz is written as one uncompressed archive. Any other
+path is written as a folder of .npy files, which load_arrays() opens
+memory-mapped, so a whole corpus can be sliced without reading it.
+
+Usage:
+  python mot_npz.py input.mot output.npz     (.mot -> archive)
+  python mot_npz.py input.npz output.mot     (archive -> .mot)
+"""
+import os
+import sys
+
+import numpy as np
+
+from motbreak import mot_codec
+
+SECTION_DTYPE = np.dtype([
+    ("h_type", "<u4"), ("h_count", "<u4"), ("h_size", "<u4"), ("h_loop", "<u4"), ("h_loopFrame", "<f4"),
+    ("first_node", "<i4"), ("n_nodes", "<i4"), ("extra_off", "<i8"), ("extra_len", "<i8"),
+])
+NODE_DTYPE = np.dtype([
+    ("index", "<i4"), ("n_type", "<u4"), ("n_sub", "<u4"), ("n_size", "<u4"),
+    ("n_tracks", "<i4"), ("extra_off", "<i8"), ("extra_len", "<i8"),
+])
+TRACK_DTYPE = np.dtype([
+    ("node", "<i4"), ("t_type", "<u4"), ("t_keys", "<u4"), ("t_size", "<u4"),
+    ("extra_off", "<i8"), ("extra_len", "<i8"), ("tail_off", "<i8"), ("tail_len", "<i8"), ("prefix", "<U32"),
+])
+
+
+def _channel_label(track_id):
+    return mot_codec.TRACK_TYPES.get(track_id, (f"0x{track_id:03X}",))[0]
+
+
+def mot_to_arrays(mot):
+    """Converte un MotFile in un dict nome -> array."""
+    arrays = {}
+    extra = bytearray()
+    sections, nodes, tracks = [], [], []
+
+    def add_extra(data):
+        off = len(extra)
+        extra.extend(bytes(data))
+        return off, len(data)
+
+    for section in mot.sections:
+        sections.append((section.h_type, section.h_count, section.h_size, section.h_loop, section.h_loopFrame,
+                         section.first_node, len(section.nodes)) + add_extra(section.extra))
+        for node in section.nodes:
+            node_row = len(nodes)
+            nodes.append((node.index, node.n_type, node.n_sub or 0, node.n_size or 0, len(node.tracks)) + add_extra(node.extra))
+            for track in node.tracks:
+                prefix = f"{node.name}.{_channel_label(track.track_id)}"
+                if f"{prefix}.frame" in arrays:
+                    n = 1
+                    while f"{prefix}#{n}.frame" in arrays:
+                        n += 1
+                    prefix = f"{prefix}#{n}"
+                fmt = track.format_type
+                dtype = mot_codec.KEY_DTYPES.get(fmt, mot_codec.KEY_DTYPES[mot_codec.FORMAT_LINEAR_16])
+                raw = memoryview(track.data).cast("B")
+                n_keys = len(raw) // dtype.itemsize
+                keys = np.frombuffer(raw, dtype=dtype, count=n_keys)
+                # key troncata a fine file: i byte restano nel blob extra
+                tail = add_extra(raw[n_keys * dtype.itemsize:])
+                div = track.precision or 1.0
+                # frame nel dtype del file: un frame 0x22 frazionario (o NaN) deve tornare identico
+                arrays[f"{prefix}.frame"] = keys["frame"].copy()
+                arrays[f"{prefix}.value_raw"] = keys["value"].copy()
+                if fmt == mot_codec.FORMAT_HERMITE_FLOAT:
+                    arrays[f"{prefix}.value"] = keys["value"].astype(np.float64)
+                else:
+                    arrays[f"{prefix}.value"] = keys["value"] / float(div)
+                if "c0" in dtype.names:
+                    arrays[f"{prefix}.c0_raw"] = keys["c0"].copy()
+                    arrays[f"{prefix}.c1_raw"] = keys["c1"].copy()
+                    arrays[f"{prefix}.c0"] = keys["c0"] / float(div)
+                    arrays[f"{prefix}.c1"] = keys["c1"] / float(div)
+                tracks.append((node_row, track.t_type, track.t_keys, track.t_size) + add_extra(track.extra) + tail + (prefix,))
+
+    trailing_off, trailing_len = add_extra(mot.trailing)
+    has_loop, loop_frame = mot.loop
+    arrays["sections"] = np.array(sections, dtype=SECTION_DTYPE)
+    arrays["nodes"] = np.array(nodes, dtype=NODE_DTYPE)
+    arrays["tracks"] = np.array(tracks, dtype=TRACK_DTYPE)
+    arrays["extra"] = np.frombuffer(bytes(extra), dtype=np.uint8)
+    arrays["trailing"] = np.array([trailing_off, trailing_len], dtype=np.int64)
+    arrays["loop"] = np.array(has_loop)
+    arrays["loop_frame"] = np.array(loop_frame, dtype=np.int32)
+    return arrays
+
+
+def arrays_to_mot(arrays):
+    """Ricostruisce il MotFile (byte-identico) dagli array."""
+    extra = bytes(np.asarray(arrays["extra"]))
+    sections_t = np.asarray(arrays["sections"])
+    nodes_t = np.asarray(arrays["nodes"])
+    tracks_t = np.asarray(arrays["tracks"])
+
+    def get_extra(row):
+        off, n = int(row["extra_off"]), int(row["extra_len"])
+        return extra[off:off + n]
+
+    tracks_by_node = {}
+    for row in tracks_t:
+        prefix = str(row["prefix"])
+        t_type = int(row["t_type"])
+        fmt = (t_type >> 16) & 0xFF
+        dtype = mot_codec.KEY_DTYPES.get(fmt, mot_codec.KEY_DTYPES[mot_codec.FORMAT_LINEAR_16])
+        frames = np.asarray(arrays[f"{prefix}.frame"])
+        keys = np.empty(len(frames), dtype=dtype)
+        keys["frame"] = frames
+        keys["value"] = arrays[f"{prefix}.value_raw"]
+        if "c0" in dtype.names:
+            keys["c0"] = arrays[f"{prefix}.c0_raw"]
+            keys["c1"] = arrays[f"{prefix}.c1_raw"]
+        tail = extra[int(row["tail_off"]):int(row["tail_off"]) + int(row["tail_len"])]
+        track = mot_codec.Track(t_type, int(row["t_keys"]), int(row["t_size"]), keys.tobytes() + tail, get_extra(row))
+        tracks_by_node.setdefault(int(row["node"]), []).append(track)
+
+    mot = mot_codec.MotFile()
+    node_row = 0
+    for srow in sections_t:
+        nodes = []
+        for _ in range(int(srow["n_nodes"])):
+            nrow = nodes_t[node_row]
+            nodes.append(mot_codec.Node(int(nrow["n_type"]), int(nrow["n_sub"]), int(nrow["n_size"]),
+                                        tracks_by_node.get(node_row, []), get_extra(nrow), int(nrow["index"])))
+            node_row += 1
+        mot.sections.append(mot_codec.Section(int(srow["h_type"]), int(srow["h_count"]), int(srow["h_size"]),
+                                              int(srow["h_loop"]), float(srow["h_loopFrame"]), nodes,
+                                              get_extra(srow), first_node=int(srow["first_node"])))
+    off, n = (int(v) for v in np.asarray(arrays["trailing"]))
+    mot.trailing = extra[off:off + n]
+    return mot
+
+
+def save_arrays(arrays, path):
+    """.npz (archivio non compresso) oppure cartella di .npy (mmap)."""
+    if path.lower().endswith(".npz"):
+        np.savez(path, **arrays)
+        return
+    os.makedirs(path, exist_ok=True)
+    for name, a in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), a)
+
+
+def load_arrays(path, mmap=True):
+    """Apre un archivio .npz o una cartella di .npy (memory-mapped)."""
+    if path.lower().endswith(".npz"):
+        return np.load(path)
+    mode = "r" if mmap else None
+    return {name[:-4]: np.load(os.path.join(path, name), mmap_mode=mode)
+            for name in os.listdir(path) if name.endswith(".npy")}
+
+
+def mot_to_npz(mot_path, out_path):
+    save_arrays(mot_to_arrays(mot_codec.load(mot_path)), out_path)
+
+
+def npz_to_mot(in_path, mot_path):
+    data = arrays_to_mot(load_arrays(in_path)).serialize()
+    with open(mot_path, "wb") as f:
+        f.write(data)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    src, dst = sys.argv[1], sys.argv[2]
+    if src.lower().endswith(".mot"):
+        mot_to_npz(src, dst)
+    else:
+        npz_to_mot(src, dst)
+    print(f"{src} -> {dst}")
@@ -0,0 +1,1651 @@
+import bpy
+import numpy as np
+import os
+import time
+import multiprocessing
+import queue
+import threading
+from functools import partial
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from bpy.app.handlers import persistent
+from bpy_extras.io_utils import ImportHelper
+from bpy.props import BoolProperty, CollectionProperty, EnumProperty, FloatProperty, IntProperty, StringProperty
+
+from . import mot_cache, mot_codec, mot_stats
+
+# Valori enum di KeyframePoint per foreach_set (interi, non stringhe)
+INTERPOLATION_BEZIER = 2  # 'BEZIER'
+HANDLE_FREE = 0           # 'FREE'
+
+# Import modal: ogni tick del timer scrive track per al massimo ~IMPORT_TICK_BUDGET s
+IMPORT_TICK_INTERVAL = 0.01
+IMPORT_TICK_BUDGET = 0.05
+
+# File da questa dimensione in su: decodifica su un thread separato che
+# passa i track a Blender tramite una coda di al massimo STREAM_QUEUE_DEPTH
+STREAM_MIN_BYTES = 1024 * 1024
+STREAM_QUEUE_DEPTH = 64
+
+# Cache su disco degli array decodificati (chiave: hash del contenuto del
+# file + mot_codec.DECODER_VERSION + costanti di precisione), LRU per
+# dimensione. Solo import non in streaming: un'entry tiene tutto il file
+DECODE_CACHE_DIR = "motbreak_decode_cache"
+DECODE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Import batch: orphans_purge ogni N file, così la memoria resta limitata
+BATCH_PURGE_EVERY = 25
+
+# Libreria lazy: custom property delle action segnaposto
+LIBRARY_PATH_PROP = "capcom_mot_path"
+LIBRARY_LOADED_PROP = "capcom_loaded"
+LIBRARY_FAILED_PROP = "capcom_load_failed"  # file (path, mtime, size) che non si è riusciti a caricare
+LIBRARY_PARENT_PROP = "capcom_library_parent"  # sulle action degli oggetti separati
+
+# Watch folder: .mot da cui viene un'action (import completi), il suo
+# proprietario e l'offset LOC_Y di Node2 usato all'import; ogni
+# WATCH_INTERVAL s si controllano mtime e dimensione dei file della cartella
+SOURCE_PROP = "capcom_source"
+SOURCE_OWNER_PROP = "capcom_source_owner"
+SOURCE_OFFSET_PROP = "capcom_node2_y_offset"
+WATCH_INTERVAL = 0.25
+
+def _ensure_action(owner):
+    """Action dell'oggetto, creata come farebbe keyframe_insert se manca."""
+    if not owner.animation_data:
+        owner.animation_data_create()
+    if not owner.animation_data.action:
+        owner.animation_data.action = bpy.data.actions.new(name=f"{owner.name}Action")
+    return owner.animation_data.action
+
+def _last_key_per_frame(frames):
+    """Indici delle key da tenere se il track ha frame duplicati (vince
+    l'ultima, come con keyframe_insert ripetuti), altrimenti None."""
+    if len(frames) < 2 or len(np.unique(frames)) == len(frames):
+        return None
+    _, last = np.unique(frames[::-1], return_index=True)
+    return np.sort(len(frames) - 1 - last)
+
+def insert_keyframes_bulk(fcurve, frames, values, handle_left, handle_right):
+    """Aggiunge tutte le key di un track in blocco (keyframe_points.add +
+    foreach_set): co, handle (array (N, 2)), interpolazione BEZIER e
+    handle FREE.
+    Come keyframe_insert, una key già presente sullo stesso frame viene
+    sostituita (APPEND mode). frames non deve contenere duplicati.
+    Non chiama fcurve.update()."""
+    points = fcurve.keyframe_points
+    n_old = len(points)
+    if n_old:
+        old_co = np.empty(n_old * 2, dtype=np.float32)
+        points.foreach_get("co", old_co)
+        clash = np.nonzero(np.isin(old_co[0::2], frames.astype(np.float32)))[0]
+        for i in clash[::-1]:
+            points.remove(points[int(i)], fast=True)
+        n_old = len(points)
+    
+    n = len(frames)
+    points.add(n)
+    total = n_old + n
+    
+    co = np.empty(total * 2, dtype=np.float32)
+    left = np.empty(total * 2, dtype=np.float32)
+    right = np.empty(total * 2, dtype=np.float32)
+    interpolation = np.empty(total, dtype=np.int32)
+    handle_left_type = np.empty(total, dtype=np.int32)
+    handle_right_type = np.empty(total, dtype=np.int32)
+    points.foreach_get("co", co)
+    points.foreach_get("handle_left", left)
+    points.foreach_get("handle_right", right)
+    points.foreach_get("interpolation", interpolation)
+    points.foreach_get("handle_left_type", handle_left_type)
+    points.foreach_get("handle_right_type", handle_right_type)
+    
+    co[n_old * 2::2] = frames
+    co[n_old * 2 + 1::2] = values
+    left[n_old * 2:] = np.asarray(handle_left, dtype=np.float64).ravel()
+    right[n_old * 2:] = np.asarray(handle_right, dtype=np.float64).ravel()
+    interpolation[n_old:] = INTERPOLATION_BEZIER
+    handle_left_type[n_old:] = HANDLE_FREE
+    handle_right_type[n_old:] = HANDLE_FREE
+    
+    points.foreach_set("co", co)
+    # Tipi FREE prima delle posizioni, così le handle restano quelle del file
+    points.foreach_set("handle_left_type", handle_left_type)
+    points.foreach_set("handle_right_type", handle_right_type)
+    points.foreach_set("handle_left", left)
+    points.foreach_set("handle_right", right)
+    points.foreach_set("interpolation", interpolation)
+
+# Un track già decodificato (valori, handle, frame con offset), pronto
+# per essere scritto in Blender. section serve per il progresso.
+TrackJob = namedtuple("TrackJob", "section node_name target prop idx frames values handle_left handle_right")
+
+class ImportState:
+    """Stato di un import, condiviso dalle fasi prepare -> plan -> apply -> finish."""
+    def __init__(self, filepath, append_mode, frame_offset, create_new_action, ignore_face, nodes=None, frame_window=None,
+                 stats=None):
+        self.filepath = filepath
+        self.append_mode = append_mode
+        self.frame_offset = frame_offset
+        self.create_new_action = create_new_action
+        self.ignore_face = ignore_face
+        # Import selettivo: insieme di nodi (o stringa per mot_codec.parse_node_mask)
+        # e finestra (start, end) in frame del file; None = tutto
+        self.node_mask = mot_codec.parse_node_mask(nodes) if isinstance(nodes, str) else nodes
+        self.frame_window = frame_window
+        self.arm = None
+        self.node2_y_offset = 0.0
+        self.jobs = []
+        self.sections = 0        # sezioni lette dal file
+        self.nodes = 0           # nodi letti dal file
+        self.global_max_frame = 0  # Traccia il frame più alto trovato in tutto il file
+        self.file_has_loop = False  # Almeno una sezione con loop attivo
+        self.file_loop_frame = 0    # Loop frame letto dal file (decimale)
+        self.cache_key = None  # miss della cache di decodifica: chiave per salvare
+        self.decoded = None    # DecodedTrack raccolti durante il parse, da salvare in cache
+        self.file_data = None  # byte letti per l'hash della cache, riusati dal parse
+        self.actions = {}      # action scritte -> nome dell'oggetto a cui appartengono
+        # Tempi per fase, contatori e log per nodo/track (mot_stats.RunStats)
+        self.stats = stats or mot_stats.RunStats("IMPORT")
+
+def find_import_armature():
+    return bpy.data.objects.get("Node2") or bpy.data.objects.get("Node0")
+
+class ImportRollback:
+    """Fotografia di ciò che l'import modifica, per annullarlo (ESC o
+    errore): action e tracce NLA degli oggetti NodeN, rotation_mode di
+    oggetti e bones, use_connect dei bones (prepare_rig disconnette Node2),
+    fps della scena, action create e fcurve toccate. I driver rimossi da
+    animation_data_clear in modalità REPLACE non vengono ripristinati."""
+    def __init__(self):
+        self.actions_before = set(bpy.data.actions)
+        self.owners = []
+        self.nla = []              # (oggetto, tracce NLA salvate da _save_nla)
+        self.rotation_modes = []   # (oggetto o pose bone, rotation_mode)
+        for name in [f"Node{i}" for i in range(36)]:
+            obj = bpy.data.objects.get(name)
+            if obj:
+                prev = obj.animation_data.action if obj.animation_data else None
+                self.owners.append((obj, prev))
+                self.nla.append((obj, _save_nla(obj)))
+                self.rotation_modes.append((obj, obj.rotation_mode))
+        self.arm = find_import_armature()
+        self.connected = []        # bones con use_connect=True
+        if self.arm and self.arm.type == 'ARMATURE':
+            self.rotation_modes += [(bone, bone.rotation_mode) for bone in self.arm.pose.bones]
+            self.connected = [bone.name for bone in self.arm.data.bones if bone.use_connect]
+        render = bpy.context.scene.render
+        self.fps = (render.fps, render.fps_base)
+        self.saved_fcurves = []    # (fcurve, array co/handle/tipi) di fcurve preesistenti
+        self.new_fcurves = []      # (action, fcurve) create in action preesistenti
+        self.removed_fcurves = []  # (action, data_path, index, gruppo, array) rimosse
+
+    def remember(self, action, fcurve, created):
+        if action not in self.actions_before:
+            return  # action nuova: viene rimossa per intero
+        if created:
+            self.new_fcurves.append((action, fcurve))
+        elif all(f is not fcurve for f, _ in self.saved_fcurves):
+            self.saved_fcurves.append((fcurve, _save_keyframes(fcurve)))
+
+    def forget(self, action, fcurve):
+        """Da chiamare prima di rimuovere una fcurve preesistente."""
+        if action in self.actions_before:
+            group = fcurve.group.name if fcurve.group else ""
+            self.removed_fcurves.append((action, fcurve.data_path, fcurve.array_index, group, _save_keyframes(fcurve)))
+
+    def restore(self):
+        for fcurve, saved in self.saved_fcurves:
+            points = fcurve.keyframe_points
+            for i in range(len(points) - 1, -1, -1):
+                points.remove(points[i], fast=True)
+            _load_keyframes(fcurve, saved)
+        for action, fcurve in self.new_fcurves:
+            action.fcurves.remove(fcurve)
+        for action, data_path, index, group, saved in self.removed_fcurves:
+            _load_keyframes(action.fcurves.new(data_path, index=index, action_group=group), saved)
+        for obj, prev in self.owners:
+            if prev is not None:
+                if not obj.animation_data:
+                    obj.animation_data_create()
+                obj.animation_data.action = prev
+            elif obj.animation_data:
+                obj.animation_data.action = None
+        for obj, tracks in self.nla:
+            _load_nla(obj, tracks)
+        for target, mode in self.rotation_modes:
+            target.rotation_mode = mode
+        arm = self.arm
+        reconnect = [name for name in self.connected if not arm.data.bones[name].use_connect] if self.connected else []
+        if reconnect:
+            current_mode = arm.mode
+            bpy.context.view_layer.objects.active = arm
+            bpy.ops.object.mode_set(mode='EDIT')
+            for name in reconnect:
+                arm.data.edit_bones[name].use_connect = True
+            bpy.ops.object.mode_set(mode=current_mode)
+        render = bpy.context.scene.render
+        render.fps, render.fps_base = self.fps
+        for action in list(bpy.data.actions):
+            if action not in self.actions_before:
+                bpy.data.actions.remove(action)
+
+# Attributi delle tracce/strip NLA salvati dal rollback
+# (frame_end dopo scale/repeat, che lo ricalcolano)
+_NLA_TRACK_ATTRS = ("name", "mute", "is_solo", "lock")
+_NLA_STRIP_ATTRS = ("action_frame_start", "action_frame_end", "scale", "repeat", "frame_end",
+                    "blend_type", "extrapolation", "blend_in", "blend_out", "mute", "influence")
+
+def _save_nla(owner):
+    if not owner.animation_data:
+        return []
+    return [({attr: getattr(track, attr) for attr in _NLA_TRACK_ATTRS},
+             [(strip.name, strip.frame_start, strip.action, {attr: getattr(strip, attr) for attr in _NLA_STRIP_ATTRS})
+              for strip in track.strips])
+            for track in owner.animation_data.nla_tracks]
+
+def _load_nla(owner, tracks):
+    """Ricrea le tracce NLA salvate se l'import le ha rimosse (animation_data_clear)."""
+    if not tracks or (owner.animation_data and len(owner.animation_data.nla_tracks)):
+        return
+    if not owner.animation_data:
+        owner.animation_data_create()
+    for track_attrs, strips in tracks:
+        track = owner.animation_data.nla_tracks.new()
+        for name, frame_start, action, strip_attrs in strips:
+            if action is None:
+                continue  # strip di transizione/meta: non si ricrea
+            strip = track.strips.new(name, int(frame_start), action)
+            for attr, value in strip_attrs.items():
+                setattr(strip, attr, value)
+        for attr, value in track_attrs.items():
+            setattr(track, attr, value)
+
+# Attributi di KeyframePoint salvati dal rollback: (nome, componenti, dtype)
+# Tipi handle prima delle posizioni, come in insert_keyframes_bulk
+_KEYFRAME_ATTRS = (
+    ("co", 2, np.float32),
+    ("handle_left_type", 1, np.int32),
+    ("handle_right_type", 1, np.int32),
+    ("handle_left", 2, np.float32),
+    ("handle_right", 2, np.float32),
+    ("interpolation", 1, np.int32),
+)
+
+def _save_keyframes(fcurve):
+    points = fcurve.keyframe_points
+    saved = {}
+    for attr, size, dtype in _KEYFRAME_ATTRS:
+        saved[attr] = np.empty(len(points) * size, dtype=dtype)
+        points.foreach_get(attr, saved[attr])
+    return saved
+
+def _load_keyframes(fcurve, saved):
+    points = fcurve.keyframe_points
+    points.add(len(saved["interpolation"]))
+    for attr, _, _ in _KEYFRAME_ATTRS:
+        points.foreach_set(attr, saved[attr])
+    fcurve.update()
+
+def resolve_target(arm, node_name):
+    """(target, tipo) di un nodo: l'armatura stessa, un suo bone o un oggetto separato."""
+    target = None
+    target_type = "NOT FOUND"
+    if arm and arm.name == node_name:
+        target = arm
+        target_type = "ARMATURE OBJECT"
+    elif arm and arm.type == 'ARMATURE':
+        target = arm.pose.bones.get(node_name)
+        if target:
+            target_type = "BONE"
+    if not target:
+        target = bpy.data.objects.get(node_name)
+        if target:
+            target_type = "SEPARATE OBJECT"
+    return target, target_type
+
+def make_track_job(state, section, node_name, target, prop, idx, keys, div):
+    """TrackJob da un track decodificato (mot_codec.TrackArrays, già diviso per div)."""
+    # In modalità APPEND, aggiungi l'offset
+    frames = np.asarray(keys.frames, dtype=np.float64) + state.frame_offset
+    
+    # Ogni nodo scrive sulle proprie keyframe, senza
+    # alcun redirect: Node1 prende le keyframe di
+    # Node1, Node2 quelle di Node2 (con use_connect
+    # disabilitato sopra, Node2 ora si muove
+    # visivamente in modo corretto).
+    write_values = np.asarray(keys.values, dtype=np.float64)
+    c0s = np.asarray(keys.c0, dtype=np.float64)
+    c1s = np.asarray(keys.c1, dtype=np.float64)
+    keep = _last_key_per_frame(frames)
+    if keep is not None:
+        frames, write_values, c0s, c1s = frames[keep], write_values[keep], c0s[keep], c1s[keep]
+    
+    # Correzione visiva: solo Node2.LOC_Y (idx==1),
+    # solo nei modelli HD. I valori del file restano
+    # quelli originali (usati per l'export); la
+    # correzione è solo per la visualizzazione in Blender.
+    if prop == "location" and idx == 1 and node_name == "Node2" and state.node2_y_offset != 0.0:
+        write_values = write_values - state.node2_y_offset
+    
+    # Handle dalle tangenti c0/c1, per tutto il track in
+    # una volta (delta_x = 1 frame, come nell'exporter)
+    with state.stats.phase("handles"):
+        handle_left, handle_right = mot_codec.tangent_handles(frames, write_values, c0s, c1s, div)
+    return TrackJob(section, node_name, target, prop, idx, frames, write_values, handle_left, handle_right)
+
+def prepare_rig(state):
+    """Modelli HD: sblocca la location di Node2 e ne ricava l'offset LOC_Y."""
+    log = state.stats.log
+    arm = state.arm
+    
+    # ====== NODE2 DISCONNECT (HD models) ======
+    # Se Node1 e Node2 sono entrambi bones e Node2 è "connected" al parent,
+    # la sua location risulta bloccata/grigia in Pose Mode. Lo disconnettiamo
+    # automaticamente (non sposta nulla nel rest pose, sblocca solo location).
+    # Node1 e Node2 scrivono ciascuno sulle proprie keyframe (nessun redirect),
+    # ma Node2.LOC_Y viene corretto sottraendo l'head.y di Node2 in rest pose:
+    # senza questa correzione il personaggio "vola" in Blender (Node2 con
+    # use_connect=False mostra la location nello spazio del parent, quindi
+    # un valore come 0.9 verrebbe interpretato come 0.9 unità SOPRA l'head
+    # di Node2, che è già a ~110 unità di altezza).
+    # Il valore originale (f_val, senza offset) resta quello che useremo
+    # in export per scrivere nel file .mot.
+    node2_y_offset = 0.0
+    if arm and arm.type == 'ARMATURE':
+        node1_is_bone = "Node1" in arm.pose.bones
+        node2_is_bone = "Node2" in arm.pose.bones
+        if node1_is_bone and node2_is_bone:
+            log("STRUCTURE: HD model (Node1 and Node2 are BONES)")
+            # head_local = head in rest pose nello spazio dell'armatura, lo
+            # stesso valore di edit_bones["Node2"].head: in Edit Mode si entra
+            # solo se Node2 è ancora connected e va disconnesso
+            bone2 = arm.data.bones.get("Node2")
+            if bone2 and bone2.use_connect:
+                current_mode = arm.mode
+                bpy.context.view_layer.objects.active = arm
+                bpy.ops.object.mode_set(mode='EDIT')
+                arm.data.edit_bones["Node2"].use_connect = False
+                bpy.ops.object.mode_set(mode=current_mode)
+                log("  -> Disconnected Node2 from parent (was use_connect=True)")
+            elif bone2:
+                log("  -> Node2 already disconnected")
+            if bone2:
+                node2_y_offset = bone2.head_local.y
+            log("  -> Node1 and Node2 will write their own keyframes normally")
+            log(f"  -> Node2.LOC_Y visual offset: -{node2_y_offset:.4f} (Node2 rest-pose head.y)")
+        else:
+            log("STRUCTURE: STANDARD model (Node1/Node2 are separate objects)")
+    state.node2_y_offset = node2_y_offset
+    # ===============================================
+
+def clear_selected_animation(state, rollback=None):
+    """REPLACE con una selezione di nodi: rimuove solo le fcurve dei nodi
+    selezionati (bones e oggetti) invece di tutta l'animazione."""
+    log = state.stats.log
+    arm = state.arm
+    names = {f"Node{i}" for i in state.node_mask}
+    action = arm.animation_data.action if arm.animation_data else None
+    if action:
+        for fcurve in list(action.fcurves):
+            path = fcurve.data_path
+            if path.startswith('pose.bones["'):
+                selected = path[len('pose.bones["'):].split('"', 1)[0] in names
+            else:
+                selected = arm.name in names
+            if selected:
+                if rollback is not None:
+                    rollback.forget(action, fcurve)
+                action.fcurves.remove(fcurve)
+    log(f"  -> Cleared animation of the selected nodes only")
+
+def prepare_import(state, rollback=None):
+    """Fase 1: log, struttura del rig (HD/standard), fps e action di destinazione."""
+    log = state.stats.log
+    filepath, append_mode, create_new_action = state.filepath, state.append_mode, state.create_new_action
+    log("\n" + "="*60)
+    log(f"IMPORTING: {filepath}")
+    if append_mode:
+        log(f"MODE: APPEND (starting at frame {state.frame_offset})")
+    elif create_new_action:
+        log(f"MODE: NEW ACTION")
+    else:
+        log(f"MODE: REPLACE (clear existing animation)")
+    
+    if state.ignore_face:
+        log(f"FACE: IGNORED (skipping section 0x06)")
+    if state.node_mask is not None:
+        log(f"NODES: only {', '.join(f'Node{i}' for i in sorted(state.node_mask))}")
+    if state.frame_window is not None:
+        log(f"FRAMES: only {state.frame_window[0]} -> {state.frame_window[1]} (file frames)")
+    
+    log("="*60)
+    
+    arm = state.arm = find_import_armature()
+    with state.stats.phase("structure"):
+        prepare_rig(state)
+    
+    bpy.context.scene.render.fps = 60
+    bpy.context.scene.render.fps_base = 1.0
+
+    if arm:
+        # Se create_new_action, crea una nuova action
+        if create_new_action:
+            action_name = os.path.splitext(os.path.basename(filepath))[0]
+            
+            if not arm.animation_data:
+                arm.animation_data_create()
+            
+            new_action = bpy.data.actions.new(name=action_name)
+            arm.animation_data.action = new_action
+            log(f"✅ Created new action: {action_name}")
+            
+            if arm.type == 'ARMATURE':
+                for bone in arm.pose.bones:
+                    bone.rotation_mode = 'XYZ'
+        
+        # Solo in modalità REPLACE, pulisci le animazioni
+        # (con una selezione di nodi, solo quelle dei nodi selezionati)
+        elif not append_mode:
+            if state.node_mask is not None:
+                clear_selected_animation(state, rollback)
+            elif arm.animation_data:
+                arm.animation_data_clear()
+            if arm.type == 'ARMATURE':
+                for bone in arm.pose.bones:
+                    bone.rotation_mode = 'XYZ'
+        else:
+            # In modalità APPEND, assicurati che rotation_mode sia XYZ
+            if arm.type == 'ARMATURE':
+                for bone in arm.pose.bones:
+                    bone.rotation_mode = 'XYZ'
+    
+    # Solo in modalità REPLACE (non append, non new action), pulisci animazioni Node0/Node1
+    if not append_mode and not create_new_action:
+        for i in range(30):
+            node = bpy.data.objects.get(f"Node{i}")
+            if node and node != arm and (state.node_mask is None or i in state.node_mask):
+                if node.animation_data:
+                    node.animation_data_clear()
+
+def plan_import(state):
+    """Fase 2: legge e decodifica il file con mot_codec (lo stesso decoder
+    dei percorsi streaming, batch, libreria e cache), senza scrivere
+    keyframe. Riempie state.jobs con un TrackJob per ogni track da
+    importare. Se plan_cached ha già letto il file, usa quei byte."""
+    data, state.file_data = state.file_data, None
+    if data is None and (state.node_mask is not None or state.frame_window is not None):
+        # Import selettivo: file mappato in memoria, il payload dei
+        # nodi/track saltati tramite gli offset non viene mai letto
+        with mot_codec.mapped_file(state.filepath) as buf:
+            _plan_mot(state, mot_codec.MotFile.parse(buf))
+        return
+    if data is None:
+        with state.stats.phase("read"), open(state.filepath, "rb") as f:
+            data = f.read()
+    _plan_mot(state, mot_codec.MotFile.parse(data))
+
+def _plan_mot(state, mot):
+    state.file_has_loop, state.file_loop_frame = mot.loop
+    state.sections = len(mot.sections)
+    nodes = state.node_mask
+    if state.decoded is None:
+        # Senza cache da riempire si decodificano solo i nodi presenti nella scena
+        present = {node.index for node in mot.nodes() if resolve_target(state.arm, node.name)[0]}
+        nodes = present if nodes is None else nodes & present
+    ranges = {}
+    tracks = mot_codec.iter_decoded_tracks(mot, state.ignore_face, nodes, state.frame_window)
+    while True:
+        with state.stats.phase("decode"):
+            dt = next(tracks, None)
+        if dt is None:
+            break
+        if state.decoded is not None:
+            state.decoded.append(dt)
+        job = job_from_decoded(state, dt)
+        if job:
+            state.jobs.append(job)
+            _add_frame_range(ranges, job)
+    _log_structure(state, mot, ranges)
+
+def _add_frame_range(ranges, job):
+    """Primo/ultimo frame scritto per nodo, per il "Frame range" di _log_structure
+    (in streaming i job non restano in memoria, il range sì)."""
+    lo, hi = job.frames.min(), job.frames.max()
+    if job.node_name in ranges:
+        old_lo, old_hi = ranges[job.node_name]
+        lo, hi = min(lo, old_lo), max(hi, old_hi)
+    ranges[job.node_name] = (lo, hi)
+
+def _log_structure(state, mot, ranges, count_nodes=True):
+    """Log per sezione/nodo (verbosity FULL) e conta dei nodi letti.
+    mot può essere solo header (lazy): servono offset, dimensioni e
+    numero di key, non le key. count_nodes=False per streaming e cache,
+    che contano i nodi dai track decodificati."""
+    log = state.stats.log
+    for section_num, section in enumerate(mot.sections, 1):
+        indices = [node.index for node in section.nodes]
+        skipped = None
+        if state.ignore_face and section.section_byte == 0x06:
+            skipped = "ignore_face = True"
+        elif state.node_mask is not None and state.node_mask.isdisjoint(indices):
+            skipped = "no selected nodes"
+        log(f"\n{'='*60}")
+        log(f"SECTION {section_num}: {section.name} (0x{section.section_byte:02X})")
+        if skipped:
+            log(f"  SKIPPED ({skipped})")
+            log(f"{'='*60}")
+            continue
+        log(f"  Offset: 0x{section.offset:08X}")
+        log(f"  Node count: {section.h_count}")
+        log(f"  Size: {section.h_size} bytes")
+        log(f"  Loop: {section.h_loop}, Loop Frame: {section.h_loopFrame}")
+        log(f"{'='*60}")
+        
+        for node in section.nodes:
+            if count_nodes:
+                state.nodes += 1
+            if state.node_mask is not None and node.index not in state.node_mask:
+                continue
+            _, target_type = resolve_target(state.arm, node.name)
+            log(f"\n  {node.name} ({target_type}):")
+            log(f"    n_type: 0x{node.n_type:08X}")
+            log(f"    Tracks found: {node.n_sub}")
+            log(f"    Node size: {node.n_size} bytes")
+            if not node.active:
+                log(f"    Operation: SKIPPED (invalid n_type)")
+                continue
+            if not node.tracks:
+                log(f"    Operation: EMPTY NODE (no tracks)")
+                continue
+            track_list = [f"{mot_codec.TRACK_TYPES[t.track_id][0]}({t.t_keys}keys)"
+                          for t in node.tracks if t.track_id in mot_codec.TRACK_TYPES]
+            if track_list:
+                log(f"    Tracks: {', '.join(track_list)}")
+            span = ranges.get(node.name)
+            if span:
+                log(f"    Frame range: {int(span[0])} → {int(span[1])}")
+                if state.append_mode:
+                    log(f"    Operation: KEYFRAMES APPENDED (offset: +{state.frame_offset})")
+                else:
+                    log(f"    Operation: KEYFRAMES INSERTED")
+            else:
+                log(f"    Operation: NO KEYFRAMES (empty tracks)")
+
+def apply_track(state, job, rollback=None):
+    """Fase 3: scrive un TrackJob nella sua fcurve (una per canale, creata o
+    trovata una volta, stesso action e gruppo che userebbe keyframe_insert)."""
+    if isinstance(job.target, bpy.types.Object):
+        # Oggetto separato o armatura
+        owner = job.target
+        data_path, group = job.prop, "Object Transforms"
+    else:
+        # PoseBone
+        owner = state.arm
+        data_path, group = f'pose.bones["{job.node_name}"].{job.prop}', job.node_name
+    with state.stats.phase("fcurves"):
+        action = _ensure_action(owner)
+        state.actions[action] = owner.name
+        fcurve = action.fcurves.find(data_path, index=job.idx)
+        created = fcurve is None
+        if created:
+            fcurve = action.fcurves.new(data_path, index=job.idx, action_group=group)
+        if rollback is not None:
+            rollback.remember(action, fcurve, created)
+        insert_keyframes_bulk(fcurve, job.frames, job.values, job.handle_left, job.handle_right)
+        fcurve.update()
+    state.stats.count("tracks")
+    state.stats.count("keys", len(job.frames))
+
+def decode_cache():
+    directory = bpy.utils.user_resource('DATAFILES', path=DECODE_CACHE_DIR, create=True)
+    return mot_cache.DecodeCache(directory, DECODE_CACHE_MAX_BYTES)
+
+def plan_cached(state, store=True):
+    """Cache di decodifica: su un hit riempie state.jobs direttamente dagli
+    array salvati (nessun parse del file) e ritorna True. Su un miss tiene
+    i byte letti per l'hash in state.file_data (per plan_import) e, con
+    store, prepara state per salvare la decodifica a fine import (solo
+    import completi: senza ignore_face).
+    In streaming store=False: raccogliere i track per l'entry terrebbe in
+    memoria tutto il file invece di STREAM_QUEUE_DEPTH track.
+    Un import con selezione di nodi/frame non usa la cache: l'hash
+    leggerebbe tutto il file, mentre plan_import (mmap) legge solo i
+    track selezionati."""
+    if state.node_mask is not None or state.frame_window is not None:
+        return False
+    try:
+        with state.stats.phase("cache"):
+            cache = decode_cache()
+            key, decoded, data = cache.lookup(state.filepath)
+    except OSError as e:
+        print(f"DECODE CACHE: unavailable ({e})")
+        return False
+    if decoded is None:
+        if not store:
+            return False
+        state.file_data = data
+        if not state.ignore_face:
+            state.cache_key = key
+            state.decoded = []
+        return False
+    state.stats.log(f"DECODE CACHE HIT ({key[:12]}): file parsing skipped, {len(decoded.tracks)} tracks")
+    state.stats.count("cache_hits")
+    plan_decoded(state, mot_cache.select(decoded, state.ignore_face, state.node_mask, state.frame_window))
+    if state.stats.verbosity == mot_stats.FULL:
+        # diagnostica per sezione/nodo: basta il parse degli header
+        ranges = {}
+        for job in state.jobs:
+            _add_frame_range(ranges, job)
+        _log_structure(state, mot_codec.load(state.filepath, lazy=True), ranges, count_nodes=False)
+    return True
+
+def store_decoded(state):
+    if state.decoded is None:
+        return
+    decoded = mot_codec.DecodedMot(state.filepath, state.file_has_loop, state.file_loop_frame, state.decoded)
+    try:
+        with state.stats.phase("cache"):
+            decode_cache().store(state.cache_key, decoded)
+    except OSError as e:
+        print(f"DECODE CACHE: could not store entry ({e})")
+    state.decoded = None
+
+def mark_source(state):
+    """Segna sulle action scritte il .mot da cui vengono, per il watch
+    folder. Solo import completi: un'action in APPEND o con una selezione
+    di nodi/frame non corrisponde più a un solo file e perde il segno."""
+    whole = not state.append_mode and state.node_mask is None and state.frame_window is None
+    for action, owner in state.actions.items():
+        if whole:
+            action[SOURCE_PROP] = os.path.abspath(state.filepath)
+            action[SOURCE_OWNER_PROP] = owner
+            action[SOURCE_OFFSET_PROP] = state.node2_y_offset
+            action["capcom_ignore_face"] = state.ignore_face
+        elif SOURCE_PROP in action:
+            del action[SOURCE_PROP]
+
+def finish_import(state):
+    """Fase 4: range della scena e info di loop sull'action."""
+    log = state.stats.log
+    arm = state.arm
+    store_decoded(state)
+    mark_source(state)
+    state.stats.count("sections", state.sections)
+    state.stats.count("nodes", state.nodes)
+    state.stats.count("bytes", os.path.getsize(state.filepath))
+    # Imposta il render range della scena: inizio sempre da 0,
+    # fine sull'ultimo frame trovato in tutta l'animazione importata
+    # (su qualsiasi nodo/sezione, incluso eventuale frame_offset di append).
+    with state.stats.phase("scene"):
+        bpy.context.scene.frame_start = 0
+        bpy.context.scene.frame_end = max(int(state.global_max_frame), 1)
+        bpy.context.scene.frame_current = 0
+    log(f"\nScene frame range set: 0 -> {int(state.global_max_frame)}")
+    
+    # Salva loop/loopFrame come custom property sull'action, così
+    # l'exporter può recuperarli automaticamente senza doverli
+    # reinserire manualmente ogni volta.
+    if arm and arm.animation_data and arm.animation_data.action:
+        action = arm.animation_data.action
+        action["capcom_loop"] = state.file_has_loop
+        action["capcom_loop_frame"] = state.file_loop_frame
+        log(f"Saved loop info on action '{action.name}': loop={state.file_has_loop}, loop_frame={state.file_loop_frame}")
+    
+    log(f"\n{'='*60}")
+    log("IMPORT COMPLETED")
+    log(f"{'='*60}\n")
+
+class TrackStream:
+    """Producer/consumer per file grandi: gli header vengono letti subito
+    (lazy, pochi byte), le key vengono decodificate su un thread separato
+    e passate al main thread di Blender come mot_codec.DecodedTrack
+    attraverso una coda limitata, così decodifica e scrittura delle
+    keyframe si sovrappongono e i track decodificati in memoria sono al
+    massimo depth."""
+    def __init__(self, filepath, skip_face=False, nodes=None, frame_window=None, depth=STREAM_QUEUE_DEPTH):
+        mot = mot_codec.load(filepath, lazy=True)
+        self.mot = mot  # header per _log_structure
+        self.loop = mot.loop
+        self.sections = len(mot.sections)
+        self.total = sum(1 for sec in mot.sections if not (skip_face and sec.section_byte == 0x06)
+                         for node in sec.nodes if nodes is None or node.index in nodes
+                         for t in node.tracks if t.t_keys and t.track_id in mot_codec.TRACK_TYPES)
+        self.queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, args=(mot, skip_face, nodes, frame_window), daemon=True)
+        self._thread.start()
+
+    def _produce(self, mot, skip_face, nodes, frame_window):
+        try:
+            for dt in mot_codec.iter_decoded_tracks(mot, skip_face, nodes, frame_window):
+                if not self._put(dt):
+                    return
+            self._put(None)
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        # Bloccante finché la coda è piena, ma si ferma se close() è stato chiamato
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def __iter__(self):
+        """DecodedTrack nell'ordine del file; gli errori del thread vengono rilanciati qui."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+def stream_jobs(state, stream):
+    """Come plan_import + state.jobs, ma un TrackJob alla volta man mano che
+    il thread di TrackStream decodifica i track."""
+    log = state.stats.log
+    log(f"STREAMING: decoding on a worker thread ({stream.total} tracks, queue depth {stream.queue.maxsize})")
+    state.file_has_loop, state.file_loop_frame = stream.loop
+    state.sections = stream.sections
+    section = 0
+    nodes = set()
+    ranges = {}
+    tracks = iter(stream)
+    while True:
+        # attesa del thread di decodifica
+        with state.stats.phase("decode"):
+            dt = next(tracks, None)
+        if dt is None:
+            if state.stats.verbosity == mot_stats.FULL:
+                _log_structure(state, stream.mot, ranges, count_nodes=False)
+            return
+        if dt.section != section:
+            section = dt.section
+            log(f"  SECTION {section}/{stream.sections}")
+        if dt.node not in nodes:
+            nodes.add(dt.node)
+            state.nodes = len(nodes)
+        job = job_from_decoded(state, dt)
+        if job:
+            _add_frame_range(ranges, job)
+            yield job
+
+def apply_capcom_logic_v15(filepath, append_mode=False, frame_offset=0, create_new_action=False, ignore_face=False,
+                           streaming=None, nodes=None, frame_window=None, use_cache=True,
+                           verbosity=mot_stats.FULL, profile=False, stats_path=None):
+    """Import sincrono. streaming=None: decodifica su un thread separato
+    (TrackStream) solo per i file da STREAM_MIN_BYTES in su. nodes (stringa
+    come "UPPER" o "10-21", o insieme di indici) e frame_window (start, end)
+    limitano l'import a una parte del file. use_cache: cache di decodifica
+    su disco (vedi plan_cached). verbosity/profile/stats_path: vedi mot_stats."""
+    stats = mot_stats.RunStats(f"IMPORT {os.path.basename(filepath)}", verbosity, profile)
+    state = ImportState(filepath, append_mode, frame_offset, create_new_action, ignore_face, nodes, frame_window, stats)
+    with stats.profiling():
+        prepare_import(state)
+    stream = None
+    try:
+        with stats.profiling():
+            if streaming is None:
+                streaming = os.path.getsize(filepath) >= STREAM_MIN_BYTES
+            if use_cache and plan_cached(state, store=not streaming):
+                jobs = state.jobs
+            elif streaming:
+                stream = TrackStream(filepath, ignore_face, state.node_mask, frame_window)
+                jobs = stream_jobs(state, stream)
+            else:
+                plan_import(state)
+                jobs = state.jobs
+            for job in jobs:
+                apply_track(state, job)
+            finish_import(state)
+        return True
+        
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        if stream is not None:
+            stream.close()
+        stats.finish(stats_path)
+
+def job_from_decoded(state, dt):
+    """TrackJob da un mot_codec.DecodedTrack (None se il nodo non è nella scena)."""
+    label, prop, idx = mot_codec.TRACK_TYPES[dt.track_id]
+    node_name = f"Node{dt.node}"
+    target, _ = resolve_target(state.arm, node_name)
+    if not target:
+        return None
+    target.rotation_mode = 'XYZ'
+    job = make_track_job(state, dt.section, node_name, target, prop, idx, dt.keys, dt.precision)
+    state.global_max_frame = max(state.global_max_frame, job.frames.max())
+    return job
+
+def plan_decoded(state, decoded):
+    """Come plan_import, ma da un mot_codec.DecodedMot già decodificato
+    (anche in un altro processo): risolve i target e riempie state.jobs."""
+    state.file_has_loop, state.file_loop_frame = decoded.loop, decoded.loop_frame
+    for dt in decoded.tracks:
+        job = job_from_decoded(state, dt)
+        if job:
+            state.jobs.append(job)
+    state.sections = max((dt.section for dt in decoded.tracks), default=0)
+    state.nodes = len({dt.node for dt in decoded.tracks})
+
+def _decode_here(path, *args):
+    try:
+        return path, mot_codec.decode_file(path, *args), None
+    except Exception as e:
+        return path, None, e
+
+def decode_files(filepaths, skip_face=False, workers=0, nodes=None, frame_window=None):
+    """Genera (path, DecodedMot o None, errore) nell'ordine di filepaths.
+    La decodifica gira in un process pool (workers=0: un processo per CPU,
+    1: nel processo corrente); al massimo 2 file per worker restano in
+    attesa di essere scritti, così la memoria non cresce col numero di file."""
+    args = (skip_face, nodes, frame_window)
+    pool = None
+    if workers != 1 and len(filepaths) > 1:
+        try:
+            # spawn: mai fare fork del processo di Blender
+            pool = ProcessPoolExecutor(max_workers=workers or None, mp_context=multiprocessing.get_context("spawn"))
+        except (OSError, ValueError, NotImplementedError) as e:
+            print(f"  -> Process pool unavailable ({e}), decoding in Blender's process")
+    if pool is None:
+        for path in filepaths:
+            yield _decode_here(path, *args)
+        return
+    
+    remaining = iter(filepaths)
+    pending = deque()
+    try:
+        for path in islice(remaining, 2 * (workers or os.cpu_count() or 1)):
+            pending.append((path, pool.submit(mot_codec.decode_file, path, *args)))
+        while pending:
+            path, future = pending.popleft()
+            try:
+                result = (path, future.result(), None)
+            except BrokenProcessPool:
+                # es. un worker che non riesce a partire: si prosegue qui
+                print("  -> Process pool broken, decoding the remaining files in Blender's process")
+                for path in [path] + [p for p, _ in pending] + list(remaining):
+                    yield _decode_here(path, *args)
+                return
+            except Exception as e:
+                result = (path, None, e)
+            for next_path in islice(remaining, 1):
+                pending.append((next_path, pool.submit(mot_codec.decode_file, next_path, *args)))
+            yield result
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def import_mot_batch(filepaths, ignore_face=False, workers=0, purge_every=BATCH_PURGE_EVERY, progress=None,
+                     nodes=None, frame_window=None):
+    """Importa ogni .mot in una propria action col nome del file
+    (armatura: "<file>", oggetti separati: "<file>_<NodeN>"), con
+    capcom_loop/capcom_loop_frame. Le action hanno fake user e non restano
+    assegnate: alla fine il rig torna alle action che aveva.
+    Ritorna (importati, falliti)."""
+    print("\n" + "="*60)
+    print(f"BATCH IMPORT: {len(filepaths)} file(s)")
+    print("="*60)
+    
+    arm = find_import_armature()
+    if not arm:
+        print("ERROR: no Node2/Node0 rig in the scene")
+        return 0, len(filepaths)
+    rig = ImportState(None, False, 0, True, ignore_face, nodes, frame_window)
+    rig.arm = arm
+    prepare_rig(rig)
+    
+    bpy.context.scene.render.fps = 60
+    bpy.context.scene.render.fps_base = 1.0
+    if arm.type == 'ARMATURE':
+        for bone in arm.pose.bones:
+            bone.rotation_mode = 'XYZ'
+    
+    # Action assegnate prima del batch, ripristinate alla fine
+    restore = ImportRollback().owners
+    
+    imported, failed = 0, 0
+    for n, (path, decoded, error) in enumerate(decode_files(filepaths, ignore_face, workers, rig.node_mask, frame_window), 1):
+        if error is not None:
+            print(f"[{n}/{len(filepaths)}] FAILED {path}: {error}")
+            failed += 1
+            continue
+        
+        stem = os.path.splitext(os.path.basename(path))[0]
+        state = ImportState(path, False, 0, True, ignore_face, rig.node_mask, frame_window)
+        state.arm = arm
+        state.node2_y_offset = rig.node2_y_offset
+        plan_decoded(state, decoded)
+        
+        actions = {}
+        for job in state.jobs:
+            owner = job.target if isinstance(job.target, bpy.types.Object) else arm
+            if owner.name not in actions:
+                name = stem if owner == arm else f"{stem}_{owner.name}"
+                action = bpy.data.actions.new(name=name)
+                action.use_fake_user = True
+                action["capcom_loop"] = state.file_has_loop
+                action["capcom_loop_frame"] = state.file_loop_frame
+                if not owner.animation_data:
+                    owner.animation_data_create()
+                owner.animation_data.action = action
+                actions[owner.name] = action
+        for job in state.jobs:
+            apply_track(state, job)
+        mark_source(state)
+        
+        imported += 1
+        print(f"[{n}/{len(filepaths)}] {stem}: {len(state.jobs)} tracks, {len(actions)} action(s), "
+              f"frames 0 -> {int(state.global_max_frame)}, loop={state.file_has_loop} ({state.file_loop_frame})")
+        if progress:
+            progress(n)
+        if purge_every and n % purge_every == 0 and hasattr(bpy.data, "orphans_purge"):
+            bpy.data.orphans_purge(do_recursive=True)
+    
+    for obj, prev in restore:
+        if prev is not None:
+            if not obj.animation_data:
+                obj.animation_data_create()
+            obj.animation_data.action = prev
+        elif obj.animation_data:
+            obj.animation_data.action = None
+    
+    print(f"\nBATCH IMPORT COMPLETED: {imported} imported, {failed} failed")
+    print(f"{'='*60}\n")
+    return imported, failed
+
+def register_mot_library(filepaths, ignore_face=False):
+    """Libreria lazy: per ogni .mot crea (o aggiorna) un'action segnaposto
+    col nome del file, senza F-Curve, che tiene solo il path, il frame range
+    e le info di loop (letti dagli header, nessuna decodifica). Le key
+    vengono costruite quando l'action viene assegnata al rig (vedi
+    _library_depsgraph_handler) e si possono scaricare con unload_library_action.
+    Ritorna (registrati, falliti)."""
+    print("\n" + "="*60)
+    print(f"LIBRARY: registering {len(filepaths)} file(s)")
+    print("="*60)
+    registered, failed = 0, 0
+    for n, path in enumerate(filepaths, 1):
+        try:
+            has_loop, loop_frame, first, last, n_tracks = mot_codec.scan_file(path, ignore_face)
+        except Exception as e:
+            print(f"[{n}/{len(filepaths)}] FAILED {path}: {e}")
+            failed += 1
+            continue
+        path = os.path.abspath(path)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        action = bpy.data.actions.get(stem)
+        if action is None or action.get(LIBRARY_PATH_PROP) != path:
+            action = bpy.data.actions.new(name=stem)
+            action[LIBRARY_LOADED_PROP] = False
+        action.use_fake_user = True
+        action[LIBRARY_PATH_PROP] = path
+        if LIBRARY_FAILED_PROP in action:
+            del action[LIBRARY_FAILED_PROP]
+        action["capcom_ignore_face"] = ignore_face
+        action["capcom_frame_start"] = first
+        action["capcom_frame_end"] = last
+        action["capcom_loop"] = has_loop
+        action["capcom_loop_frame"] = loop_frame
+        registered += 1
+        print(f"[{n}/{len(filepaths)}] {action.name}: {n_tracks} tracks, frames {first} -> {last}, loop={has_loop} ({loop_frame})")
+    print(f"\nLIBRARY: {registered} placeholder action(s), {failed} failed")
+    print(f"{'='*60}\n")
+    return registered, failed
+
+def is_library_action(action):
+    return action is not None and LIBRARY_PATH_PROP in action
+
+def _library_file_stamp(path):
+    """Path, mtime e dimensione del file di un segnaposto ("missing" se non c'è)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{path}|missing"
+    return f"{path}|{st.st_mtime_ns}|{st.st_size}"
+
+def library_load_failed(action):
+    """True se il file dell'action non si è potuto caricare e da allora non
+    è cambiato (stesso path, mtime e dimensione): non si riprova."""
+    failed = action.get(LIBRARY_FAILED_PROP)
+    return failed is not None and failed == _library_file_stamp(action[LIBRARY_PATH_PROP])
+
+def load_library_action(action):
+    """Costruisce le F-Curve di un'action segnaposto già assegnata al rig
+    (le tracce degli oggetti separati vanno in "<action>_<NodeN>", assegnate
+    a quegli oggetti). Ritorna True se l'action è stata caricata."""
+    if action.get(LIBRARY_LOADED_PROP):
+        return True
+    arm = find_import_armature()
+    if not arm or not arm.animation_data or arm.animation_data.action != action:
+        return False
+    path = action[LIBRARY_PATH_PROP]
+    if library_load_failed(action):
+        return False
+    print(f"LIBRARY: loading '{action.name}' from {path}")
+    state = ImportState(path, False, 0, False, bool(action.get("capcom_ignore_face", False)),
+                        stats=mot_stats.RunStats("LIBRARY", mot_stats.QUIET))
+    state.arm = arm
+    try:
+        prepare_rig(state)
+        if not plan_cached(state):
+            plan_import(state)
+            store_decoded(state)
+    except Exception as e:
+        # Segnato sull'action: nessun nuovo tentativo (né messaggio) finché
+        # il file non cambia, anche se l'handler riparte a ogni frame
+        action[LIBRARY_FAILED_PROP] = _library_file_stamp(path)
+        print(f"LIBRARY: could not load '{action.name}': {e} (not retried until the file changes)")
+        return False
+    
+    for job in state.jobs:
+        owner = job.target
+        if isinstance(owner, bpy.types.Object) and owner != arm:
+            name = f"{action.name}_{owner.name}"
+            sub = bpy.data.actions.get(name)
+            if sub is None or sub.get(LIBRARY_PARENT_PROP) != action.name:
+                sub = bpy.data.actions.new(name=name)
+                sub[LIBRARY_PARENT_PROP] = action.name
+            if not owner.animation_data:
+                owner.animation_data_create()
+            owner.animation_data.action = sub
+    for job in state.jobs:
+        apply_track(state, job)
+    mark_source(state)
+    action[LIBRARY_LOADED_PROP] = True
+    if LIBRARY_FAILED_PROP in action:
+        del action[LIBRARY_FAILED_PROP]
+    
+    scene = bpy.context.scene
+    scene.frame_start = 0
+    scene.frame_end = max(int(state.global_max_frame), 1)
+    print(f"LIBRARY: '{action.name}' loaded, {len(state.jobs)} tracks, frames 0 -> {int(state.global_max_frame)}")
+    return True
+
+def unload_library_action(action):
+    """Rimuove le F-Curve di un'action della libreria (e le action degli
+    oggetti separati create al caricamento): torna un segnaposto leggero.
+    Toglie anche il segno di mark_source, altrimenti il watch folder
+    ricreerebbe le F-Curve nel segnaposto al prossimo cambio del .mot."""
+    for fcurve in list(action.fcurves):
+        action.fcurves.remove(fcurve)
+    for sub in [a for a in bpy.data.actions if a.get(LIBRARY_PARENT_PROP) == action.name]:
+        bpy.data.actions.remove(sub)
+    for prop in (SOURCE_PROP, SOURCE_OWNER_PROP, SOURCE_OFFSET_PROP):
+        if prop in action:
+            del action[prop]
+    action[LIBRARY_LOADED_PROP] = False
+
+# Nomi delle action segnaposto con un caricamento già schedulato
+_library_pending = set()
+
+def _library_load_timer(name):
+    _library_pending.discard(name)
+    action = bpy.data.actions.get(name)
+    if is_library_action(action):
+        load_library_action(action)
+    return None
+
+@persistent
+def _library_depsgraph_handler(scene, depsgraph=None):
+    """Un segnaposto assegnato al rig viene caricato al prossimo giro
+    dell'event loop (da un timer: dentro l'handler non si cambia modo né
+    si creano dati)."""
+    arm = find_import_armature()
+    action = arm.animation_data.action if arm and arm.animation_data else None
+    if not is_library_action(action) or action.get(LIBRARY_LOADED_PROP) or action.name in _library_pending:
+        return
+    if library_load_failed(action):
+        return
+    _library_pending.add(action.name)
+    bpy.app.timers.register(partial(_library_load_timer, action.name), first_interval=0.0)
+
+def _keyframes_match(fcurve, job):
+    """True se la fcurve ha già esattamente le key del job (co e handle,
+    in float32 come le scrive insert_keyframes_bulk)."""
+    points = fcurve.keyframe_points
+    n = len(job.frames)
+    if len(points) != n:
+        return False
+    co = np.empty(n * 2, dtype=np.float32)
+    co[0::2] = job.frames
+    co[1::2] = job.values
+    for attr, expected in (("co", co), ("handle_left", job.handle_left), ("handle_right", job.handle_right)):
+        current = np.empty(n * 2, dtype=np.float32)
+        points.foreach_get(attr, current)
+        if not np.array_equal(current, np.asarray(expected, dtype=np.float32).ravel()):
+            return False
+    return True
+
+def reload_changed_tracks(filepath):
+    """Hot reload: ridecodifica un .mot cambiato e, nelle action importate
+    da quel file (SOURCE_PROP), riscrive solo le F-Curve le cui key sono
+    cambiate; i canali spariti dal file vengono rimossi.
+    Ritorna (fcurve riscritte, fcurve invariate)."""
+    filepath = os.path.abspath(filepath)
+    by_owner = {}
+    for action in bpy.data.actions:
+        if is_library_action(action) and not action.get(LIBRARY_LOADED_PROP):
+            continue  # segnaposto scaricato: le key arrivano al prossimo caricamento
+        if action.get(SOURCE_PROP) == filepath:
+            by_owner.setdefault(action.get(SOURCE_OWNER_PROP), []).append(action)
+    if not by_owner:
+        return 0, 0
+    arm = find_import_armature()
+    if not arm:
+        return 0, 0
+    
+    # Struttura del rig già sistemata dall'import: si riusa l'offset di
+    # Node2 salvato allora, senza prepare_rig (log, Edit Mode)
+    state = ImportState(filepath, False, 0, False, False)
+    state.arm = arm
+    state.node2_y_offset = next((action[SOURCE_OFFSET_PROP] for actions in by_owner.values()
+                                 for action in actions if SOURCE_OFFSET_PROP in action), 0.0)
+    decoded = mot_codec.decode_file(filepath)
+    plan_decoded(state, decoded)
+    face = {f"Node{i}" for i in mot_codec.NODE_PRESETS["FACE"]}
+    
+    rewritten, unchanged = 0, 0
+    for owner_name, actions in by_owner.items():
+        for action in actions:
+            skip_face = bool(action.get("capcom_ignore_face", False))
+            wanted = set()
+            for job in state.jobs:
+                owner = job.target if isinstance(job.target, bpy.types.Object) else arm
+                if owner.name != owner_name or (skip_face and job.node_name in face):
+                    continue
+                if isinstance(job.target, bpy.types.Object):
+                    data_path, group = job.prop, "Object Transforms"
+                else:
+                    data_path, group = f'pose.bones["{job.node_name}"].{job.prop}', job.node_name
+                wanted.add((data_path, job.idx))
+                fcurve = action.fcurves.find(data_path, index=job.idx)
+                if fcurve is None:
+                    fcurve = action.fcurves.new(data_path, index=job.idx, action_group=group)
+                elif _keyframes_match(fcurve, job):
+                    unchanged += 1
+                    continue
+                points = fcurve.keyframe_points
+                for i in range(len(points) - 1, -1, -1):
+                    points.remove(points[i], fast=True)
+                insert_keyframes_bulk(fcurve, job.frames, job.values, job.handle_left, job.handle_right)
+                fcurve.update()
+                rewritten += 1
+            # Canali .mot (loc/rot/scale) che nel file non ci sono più
+            for fcurve in list(action.fcurves):
+                channel = fcurve.data_path.rsplit(".", 1)[-1]
+                if channel in ("location", "rotation_euler", "scale") and (fcurve.data_path, fcurve.array_index) not in wanted:
+                    action.fcurves.remove(fcurve)
+                    rewritten += 1
+            action["capcom_loop"] = state.file_has_loop
+            action["capcom_loop_frame"] = state.file_loop_frame
+    return rewritten, unchanged
+
+class FolderWatch:
+    """Controlla mtime e dimensione dei .mot di una cartella (da un timer
+    di Blender) e ricarica quelli cambiati con reload_changed_tracks. Un
+    file cambiato viene ricaricato solo quando due controlli consecutivi
+    trovano la stessa dimensione e lo stesso mtime: un file ancora in
+    scrittura, troncato a fine sezione, si leggerebbe senza errori ma
+    senza le sezioni mancanti (e le loro F-Curve verrebbero rimosse)."""
+    def __init__(self, directory, interval=WATCH_INTERVAL):
+        self.directory = os.path.abspath(directory)
+        self.interval = interval
+        self.stamps = self._scan()
+        self.changing = {}  # path -> (mtime, size) cambiati al controllo precedente
+
+    def _scan(self):
+        stamps = {}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return stamps
+        for name in names:
+            if name.lower().endswith(".mot"):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stamps[path] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def tick(self):
+        stamps = self._scan()
+        changing = {}
+        for path, stamp in stamps.items():
+            if self.stamps.get(path, stamp) == stamp:
+                continue
+            if self.changing.get(path) != stamp:
+                # appena cambiato: si aspetta un controllo con lo stesso stamp
+                changing[path] = stamp
+                stamps[path] = self.stamps[path]
+                continue
+            t0 = time.perf_counter()
+            try:
+                rewritten, unchanged = reload_changed_tracks(path)
+            except Exception as e:
+                # file stabile ma non leggibile: si riprova quando cambia di nuovo
+                print(f"WATCH: could not reload {os.path.basename(path)}: {e}")
+                continue
+            if rewritten or unchanged:
+                print(f"WATCH: {os.path.basename(path)} reloaded in {(time.perf_counter() - t0) * 1000:.1f} ms, "
+                      f"{rewritten} F-Curve(s) rewritten, {unchanged} unchanged")
+        self.stamps = stamps
+        self.changing = changing
+        return self.interval
+
+_folder_watch = None
+
+def _folder_watch_tick():
+    if _folder_watch is None:
+        return None
+    return _folder_watch.tick()
+
+def start_folder_watch(directory, interval=WATCH_INTERVAL):
+    global _folder_watch
+    stop_folder_watch()
+    _folder_watch = FolderWatch(directory, interval)
+    bpy.app.timers.register(_folder_watch_tick, first_interval=interval)
+    print(f"WATCH: watching {_folder_watch.directory} ({len(_folder_watch.stamps)} .mot file(s))")
+
+def stop_folder_watch():
+    global _folder_watch
+    if bpy.app.timers.is_registered(_folder_watch_tick):
+        bpy.app.timers.unregister(_folder_watch_tick)
+    if _folder_watch is not None:
+        print(f"WATCH: stopped watching {_folder_watch.directory}")
+    _folder_watch = None
+
+class IMPORT_OT_capcom_outbreak_v15(bpy.types.Operator, ImportHelper):
+    bl_idname = "import_anim.capcom_outbreak_v15"
+    bl_label = "Import Outbreak v1.13"
+    filename_ext = ".mot"
+    
+    create_new_action: BoolProperty(
+        name="New Action",
+        description="Create a new action (keeps existing animations)",
+        default=False,
+    )
+    
+    append_mode: BoolProperty(
+        name="Append Mode",
+        description="Add animation to current action starting at timeline cursor",
+        default=False,
+    )
+    
+    ignore_face: BoolProperty(
+        name="Ignore Face (0x06)",
+        description="Skip facial animation section (Node22-27)",
+        default=False,
+    )
+    
+    node_selection: StringProperty(
+        name="Nodes",
+        description="Only import these nodes: LOWER, UPPER, FACE, HANDS, HANDS_L, HANDS_R and/or indices and ranges like 10-21, 28 (empty = all nodes)",
+        default="",
+    )
+    
+    use_frame_window: BoolProperty(
+        name="Frame Window",
+        description="Only import keys between Start and End (frames of the .mot file)",
+        default=False,
+    )
+    
+    frame_window_start: IntProperty(name="Start", default=0)
+    
+    frame_window_end: IntProperty(name="End", default=100)
+    
+    use_cache: BoolProperty(
+        name="Decode Cache",
+        description="Reuse decoded tracks of files imported before (on-disk cache keyed by file content; not used with a node or frame selection)",
+        default=True,
+    )
+    
+    background: BoolProperty(
+        name="Keep UI Responsive",
+        description="Insert keyframes a chunk at a time with a progress bar (ESC cancels and undoes the import)",
+        default=True,
+    )
+    
+    verbosity: EnumProperty(
+        name="Console Log",
+        items=mot_stats.VERBOSITY_ITEMS,
+        default=mot_stats.FULL,
+    )
+    
+    profile: BoolProperty(
+        name="Profile (cProfile)",
+        description="Run the import under cProfile (top functions in the summary, or a .prof file next to the Stats JSON)",
+        default=False,
+    )
+    
+    stats_path: StringProperty(
+        name="Stats JSON",
+        description="Also write phase timings and counters to this JSON file (empty = don't write)",
+        default="",
+        subtype='FILE_PATH',
+    )
+
+    def execute(self, context):
+        # Ottieni la posizione corrente del cursore nella timeline
+        current_frame = context.scene.frame_current
+        
+        # Se append_mode è attivo, usa il frame corrente come offset
+        frame_offset = current_frame if self.append_mode else 0
+        
+        try:
+            nodes, frame_window = _selection(self)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        
+        # Senza finestra (script/background) l'import resta sincrono
+        if not self.background or context.window is None:
+            apply_capcom_logic_v15(self.filepath, append_mode=self.append_mode, frame_offset=frame_offset, create_new_action=self.create_new_action, ignore_face=self.ignore_face,
+                                   nodes=nodes, frame_window=frame_window, use_cache=self.use_cache,
+                                   verbosity=self.verbosity, profile=self.profile, stats_path=bpy.path.abspath(self.stats_path) or None)
+            return {'FINISHED'}
+        
+        # Decodifica tutto subito (o su un thread, per i file grandi), poi le
+        # keyframe vengono scritte a blocchi a ogni tick del timer (modal),
+        # così la UI resta reattiva
+        self._rollback = ImportRollback()
+        stats = mot_stats.RunStats(f"IMPORT {os.path.basename(self.filepath)}", self.verbosity, self.profile)
+        self._state = ImportState(self.filepath, self.append_mode, frame_offset, self.create_new_action, self.ignore_face, nodes, frame_window, stats)
+        self._stream = None
+        self._job = None
+        self._next = 0
+        try:
+            with stats.profiling():
+                prepare_import(self._state, self._rollback)
+                streaming = os.path.getsize(self.filepath) >= STREAM_MIN_BYTES
+                if self.use_cache and plan_cached(self._state, store=not streaming):
+                    self._jobs = iter(self._state.jobs)
+                    self._total = len(self._state.jobs)
+                elif streaming:
+                    self._stream = TrackStream(self.filepath, self.ignore_face, nodes, frame_window)
+                    self._jobs = stream_jobs(self._state, self._stream)
+                    self._total = self._stream.total
+                else:
+                    plan_import(self._state)
+                    self._jobs = iter(self._state.jobs)
+                    self._total = len(self._state.jobs)
+        except Exception as e:
+            print(f"ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            self._rollback.restore()
+            self.report({'ERROR'}, f"Import failed: {e}")
+            return {'CANCELLED'}
+        
+        wm = context.window_manager
+        wm.progress_begin(0, max(self._total, 1))
+        self._timer = wm.event_timer_add(IMPORT_TICK_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        self._update_status(context)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self._stop(context)
+            self._rollback.restore()
+            print(f"IMPORT CANCELLED: {self.filepath} (changes rolled back)")
+            self.report({'WARNING'}, "Import cancelled, changes rolled back")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        
+        done = False
+        try:
+            # Quanti più track possibile entro il budget del tick
+            deadline = time.perf_counter() + IMPORT_TICK_BUDGET
+            with self._state.stats.profiling():
+                while True:
+                    job = next(self._jobs, None)
+                    if job is None:
+                        done = True
+                        finish_import(self._state)
+                        break
+                    apply_track(self._state, job, self._rollback)
+                    self._job = job
+                    self._next += 1
+                    if time.perf_counter() >= deadline:
+                        break
+        except Exception as e:
+            print(f"ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            self._stop(context)
+            self._rollback.restore()
+            self.report({'ERROR'}, f"Import failed, changes rolled back: {e}")
+            return {'CANCELLED'}
+        
+        if done:
+            self._stop(context)
+            self._state.stats.finish(bpy.path.abspath(self.stats_path) or None)
+            self.report({'INFO'}, f"Imported {os.path.basename(self.filepath)}: {self._state.nodes} nodes, {self._next} tracks")
+            return {'FINISHED'}
+        
+        context.window_manager.progress_update(self._next)
+        self._update_status(context)
+        return {'RUNNING_MODAL'}
+
+    def _update_status(self, context):
+        state = self._state
+        section, node = (self._job.section, self._job.node_name) if self._job else (1, "-")
+        context.workspace.status_text_set(
+            f"Importing {os.path.basename(self.filepath)}: section {section}/{state.sections}, "
+            f"{node}, track {self._next}/{self._total} (ESC to cancel)")
+
+    def _stop(self, context):
+        if self._stream is not None:
+            self._stream.close()
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+class IMPORT_OT_capcom_outbreak_batch(bpy.types.Operator, ImportHelper):
+    """Import several .mot files (or a whole folder), one action per file"""
+    bl_idname = "import_anim.capcom_outbreak_batch"
+    bl_label = "Import Outbreak Batch"
+    filename_ext = ".mot"
+    
+    filter_glob: StringProperty(default="*.mot", options={'HIDDEN'})
+    files: CollectionProperty(type=bpy.types.OperatorFileListElement, options={'HIDDEN', 'SKIP_SAVE'})
+    directory: StringProperty(subtype='DIR_PATH', options={'HIDDEN'})
+    
+    whole_folder: BoolProperty(
+        name="Whole Folder",
+        description="Import every .mot in the folder, ignoring the selection",
+        default=False,
+    )
+    
+    ignore_face: BoolProperty(
+        name="Ignore Face (0x06)",
+        description="Skip facial animation section (Node22-27)",
+        default=False,
+    )
+    
+    node_selection: StringProperty(
+        name="Nodes",
+        description="Only import these nodes: LOWER, UPPER, FACE, HANDS, HANDS_L, HANDS_R and/or indices and ranges like 10-21, 28 (empty = all nodes)",
+        default="",
+    )
+    
+    use_frame_window: BoolProperty(
+        name="Frame Window",
+        description="Only import keys between Start and End (frames of the .mot file)",
+        default=False,
+    )
+    
+    frame_window_start: IntProperty(name="Start", default=0)
+    
+    frame_window_end: IntProperty(name="End", default=100)
+    
+    library: BoolProperty(
+        name="Library (Lazy)",
+        description="Only register placeholder actions (path, frame range, loop); keys are decoded when an action is assigned to the rig",
+        default=False,
+    )
+    
+    workers: IntProperty(
+        name="Decode Processes",
+        description="Processes decoding files in parallel (0 = one per CPU, 1 = decode inside Blender)",
+        default=0,
+        min=0,
+    )
+
+    def execute(self, context):
+        directory = self.directory or os.path.dirname(self.filepath)
+        if self.whole_folder:
+            names = sorted(n for n in os.listdir(directory) if n.lower().endswith(".mot"))
+        else:
+            names = [f.name for f in self.files if f.name] or [os.path.basename(self.filepath)]
+        filepaths = [os.path.join(directory, n) for n in names if n.lower().endswith(".mot")]
+        if not filepaths:
+            self.report({'WARNING'}, "No .mot files selected")
+            return {'CANCELLED'}
+        if self.library:
+            registered, failed = register_mot_library(filepaths, self.ignore_face)
+            if failed:
+                self.report({'WARNING'}, f"Registered {registered} clip(s), {failed} file(s) failed (see console)")
+            else:
+                self.report({'INFO'}, f"Registered {registered} clip(s)")
+            return {'FINISHED'} if registered else {'CANCELLED'}
+        try:
+            nodes, frame_window = _selection(self)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        
+        wm = context.window_manager
+        wm.progress_begin(0, len(filepaths))
+        try:
+            imported, failed = import_mot_batch(filepaths, self.ignore_face, self.workers, progress=wm.progress_update,
+                                                nodes=nodes, frame_window=frame_window)
+        finally:
+            wm.progress_end()
+        
+        if failed:
+            self.report({'WARNING'}, f"Imported {imported} action(s), {failed} file(s) failed (see console)")
+        else:
+            self.report({'INFO'}, f"Imported {imported} action(s)")
+        return {'FINISHED'} if imported else {'CANCELLED'}
+
+class ANIM_OT_capcom_library_unload(bpy.types.Operator):
+    """Drop the keys of loaded Outbreak library clips, keeping only their placeholders"""
+    bl_idname = "anim.capcom_library_unload"
+    bl_label = "Unload Outbreak Library Clips"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    keep_active: BoolProperty(
+        name="Keep Active Clip",
+        description="Don't unload the clip currently assigned to the rig",
+        default=True,
+    )
+
+    def execute(self, context):
+        arm = find_import_armature()
+        active = arm.animation_data.action if arm and arm.animation_data else None
+        unloaded = 0
+        for action in list(bpy.data.actions):
+            if not is_library_action(action) or not action.get(LIBRARY_LOADED_PROP):
+                continue
+            if action == active:
+                if self.keep_active:
+                    continue
+                arm.animation_data.action = None
+            unload_library_action(action)
+            unloaded += 1
+        self.report({'INFO'}, f"Unloaded {unloaded} clip(s)")
+        return {'FINISHED'}
+
+class IMPORT_OT_capcom_outbreak_watch(bpy.types.Operator):
+    """Reload .mot files of a folder when they change on disk (only the changed F-Curves are rewritten)"""
+    bl_idname = "import_anim.capcom_outbreak_watch"
+    bl_label = "Watch Outbreak Folder"
+    
+    directory: StringProperty(subtype='DIR_PATH')
+    filter_glob: StringProperty(default="*.mot", options={'HIDDEN'})
+    
+    interval: FloatProperty(
+        name="Interval",
+        description="Seconds between two checks of the folder",
+        default=WATCH_INTERVAL,
+        min=0.05,
+    )
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        if not os.path.isdir(self.directory):
+            self.report({'ERROR'}, f"Not a folder: {self.directory}")
+            return {'CANCELLED'}
+        start_folder_watch(self.directory, self.interval)
+        self.report({'INFO'}, f"Watching {self.directory}")
+        return {'FINISHED'}
+
+class IMPORT_OT_capcom_outbreak_watch_stop(bpy.types.Operator):
+    """Stop watching the Outbreak .mot folder"""
+    bl_idname = "import_anim.capcom_outbreak_watch_stop"
+    bl_label = "Stop Watching Outbreak Folder"
+
+    def execute(self, context):
+        stop_folder_watch()
+        return {'FINISHED'}
+
+def _selection(op):
+    """(nodi, finestra di frame) dalle opzioni di import selettivo; ValueError se la selezione non è valida."""
+    nodes = mot_codec.parse_node_mask(op.node_selection)
+    frame_window = None
+    if op.use_frame_window:
+        frame_window = (min(op.frame_window_start, op.frame_window_end), max(op.frame_window_start, op.frame_window_end))
+    return nodes, frame_window
+
+def menu_func_import(self, context):
+    self.layout.operator(IMPORT_OT_capcom_outbreak_v15.bl_idname, text="Outbreak Import (.mot)")
+    self.layout.operator(IMPORT_OT_capcom_outbreak_batch.bl_idname, text="Outbreak Batch Import (.mot)")
+    if _folder_watch is None:
+        self.layout.operator(IMPORT_OT_capcom_outbreak_watch.bl_idname, text="Outbreak Watch Folder (.mot)")
+    else:
+        self.layout.operator(IMPORT_OT_capcom_outbreak_watch_stop.bl_idname, text="Stop Outbreak Watch Folder")
+
+def register():
+    bpy.utils.register_class(IMPORT_OT_capcom_outbreak_v15)
+    bpy.utils.register_class(IMPORT_OT_capcom_outbreak_batch)
+    bpy.utils.register_class(ANIM_OT_capcom_library_unload)
+    bpy.utils.register_class(IMPORT_OT_capcom_outbreak_watch)
+    bpy.utils.register_class(IMPORT_OT_capcom_outbreak_watch_stop)
+    bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
+    if _library_depsgraph_handler not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_library_depsgraph_handler)
+
+def unregister():
+    if _library_depsgraph_handler in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_library_depsgraph_handler)
+    stop_folder_watch()
+    bpy.utils.unregister_class(IMPORT_OT_capcom_outbreak_watch_stop)
+    bpy.utils.unregister_class(IMPORT_OT_capcom_outbreak_watch)
+    bpy.utils.unregister_class(ANIM_OT_capcom_library_unload)
+    bpy.utils.unregister_class(IMPORT_OT_capcom_outbreak_batch)
+    bpy.utils.unregister_class(IMPORT_OT_capcom_outbreak_v15)
+    bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
@@ -0,0 +1,857 @@
+import bpy
+from bpy_extras.io_utils import ExportHelper
+from bpy.props import IntProperty, BoolProperty, EnumProperty, StringProperty
+import numpy as np
+import os
+import multiprocessing
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fnmatch import fnmatchcase
+from itertools import islice
+
+from . import mot_codec, mot_stats
+
+def sample_fcurve(fcurve, frame_start, frame_end):
+    """(co, handle_left, handle_right) delle key con frame_start <= frame <= frame_end,
+    come array (N, 2): tre foreach_get per tutta la fcurve invece di sei
+    accessi RNA per key. Le key di una fcurve sono ordinate per frame, quindi
+    il range si trova con searchsorted (maschera se non lo sono)."""
+    points = fcurve.keyframe_points
+    n = len(points)
+    arrays = []
+    for attr in ("co", "handle_left", "handle_right"):
+        a = np.empty(n * 2, dtype=np.float32)
+        points.foreach_get(attr, a)
+        arrays.append(a.reshape(-1, 2))
+    frames = arrays[0][:, 0]
+    if np.all(frames[1:] >= frames[:-1]):
+        sel = slice(np.searchsorted(frames, frame_start, "left"), np.searchsorted(frames, frame_end, "right"))
+    else:
+        sel = (frames >= frame_start) & (frames <= frame_end)
+    return tuple(a[sel] for a in arrays)
+
+def index_fcurves(action):
+    """Un solo passaggio sulle fcurve di un'action: (data_path, index) -> fcurve
+    e, per ogni bone, l'insieme dei canali (prop, index) con una fcurve."""
+    fcurves = {}
+    bone_channels = {}
+    for fc in action.fcurves:
+        fcurves.setdefault((fc.data_path, fc.array_index), fc)
+        if fc.data_path.startswith('pose.bones["'):
+            bone, _, prop = fc.data_path[len('pose.bones["'):].partition('"].')
+            if prop:
+                bone_channels.setdefault(bone, set()).add((prop, fc.array_index))
+    return fcurves, bone_channels
+
+# Dove leggere le fcurve di un nodo: owner = nome dell'oggetto con l'action,
+# bone = pose bone dentro owner (None = l'oggetto stesso), prefix = prefisso
+# del data_path, loc_* = precisione, segno e offset per asse delle location
+NodeTarget = namedtuple("NodeTarget", "target_type owner bone prefix loc_precision loc_mult loc_offset")
+
+class RigProfile:
+    """Struttura del rig vista dall'exporter: armatura Node2 o Node0, modello
+    HD, offset LOC_Y di Node2 e il NodeTarget di ogni nodo. Contiene solo
+    nomi e numeri (niente riferimenti bpy), gli oggetti si risolvono con
+    resolve() al momento dell'export."""
+    def __init__(self, arm):
+        bones = arm.pose.bones if arm.type == 'ARMATURE' else {}
+        self.arm_is_node0 = arm.name == "Node0"
+        # HD: Node1 e Node2 sono bones. L'offset di Node2.LOC_Y è l'head in
+        # rest pose (spazio armatura) = edit_bones["Node2"].head, letto da
+        # data.bones senza passare in Edit Mode
+        self.node1_node2_are_bones = "Node1" in bones and "Node2" in bones
+        self.node2_y_offset = arm.data.bones["Node2"].head_local.y if self.node1_node2_are_bones else 0.0
+        self.nodes = {}
+        for node_idx in range(28):
+            node_name = f"Node{node_idx}"
+            if self.arm_is_node0:
+                # STRUTTURA ALTERNATIVA: Node0 = Armatura, Node1-27 = Bones
+                if node_idx == 0:
+                    self.nodes[0] = self._target(0, "ARMATURE OBJECT", arm.name)
+                elif node_name in bones:
+                    self.nodes[node_idx] = self._target(node_idx, "BONE", arm.name, node_name)
+            elif node_idx in (0, 1):
+                # STRUTTURA STANDARD: Node0/1 = Empty, Node2 = Armatura, Node3-27 = Bones
+                if bpy.data.objects.get(node_name):
+                    self.nodes[node_idx] = self._target(node_idx, "SEPARATE OBJECT", node_name)
+            elif node_idx == 2 and arm.name == node_name:
+                self.nodes[2] = self._target(2, "ARMATURE OBJECT", arm.name)
+            elif node_name in bones:
+                self.nodes[node_idx] = self._target(node_idx, "BONE", arm.name, node_name)
+        # Node0 armatura: Node2 può ricevere le animazioni del bone Node0
+        self.node2_from_node0 = None
+        if self.arm_is_node0 and "Node0" in bones:
+            self.node2_from_node0 = self._target(2, "BONE Node0 (writing as Node2)", arm.name, "Node0")
+
+    def _target(self, node_idx, target_type, owner, bone=None):
+        # Location facciali (Node23-27): FACE_PRECISION, ma Node24/26 usano
+        # FACE_PRECISION_ALT; segno invertito su tutti gli assi, coerente con
+        # l'importer che legge con div=-precision (es. -256, -512)
+        if 23 <= node_idx <= 27:
+            loc_precision = mot_codec.FACE_PRECISION_ALT if node_idx in (24, 26) else mot_codec.FACE_PRECISION
+            loc_mult = -1.0
+        else:
+            loc_precision = mot_codec.LOC_PRECISION
+            loc_mult = 1.0
+        # Offset HD: solo Node2.LOC_Y (axis==1) nei modelli HD
+        loc_offset = (0.0, self.node2_y_offset, 0.0) if self.node1_node2_are_bones and node_idx == 2 else (0.0, 0.0, 0.0)
+        prefix = f'pose.bones["{bone}"].' if bone else ""
+        return NodeTarget(target_type, owner, bone, prefix, loc_precision, loc_mult, loc_offset)
+
+    @staticmethod
+    def resolve(entry, actions):
+        """(target, action) di un NodeTarget: oggetto o pose bone, e l'action
+        del suo oggetto presa da actions (nome oggetto -> action).
+        (None, None) se non esiste più."""
+        owner = bpy.data.objects.get(entry.owner) if entry else None
+        if owner is None:
+            return None, None
+        target = owner.pose.bones.get(entry.bone) if entry.bone else owner
+        return target, actions.get(entry.owner)
+
+def rig_signature(arm):
+    """Tutto ciò da cui dipende RigProfile: nome e tipo dell'armatura, bones,
+    rest pose di Node2 e presenza degli oggetti Node0/Node1."""
+    bones = arm.data.bones if arm.type == 'ARMATURE' else []
+    node2 = arm.data.bones.get("Node2") if arm.type == 'ARMATURE' else None
+    return (arm.name, arm.type, tuple(b.name for b in bones),
+            tuple(node2.head_local) if node2 else None,
+            tuple(bpy.data.objects.get(n) is not None for n in ("Node0", "Node1")))
+
+# nome armatura -> (rig_signature, RigProfile)
+_rig_profiles = {}
+
+def rig_profile(arm):
+    """(RigProfile, cached): calcolato una volta per armatura e riusato
+    finché rig_signature non cambia (bones aggiunti/rinominati, rest pose
+    di Node2 modificata, Node0/Node1 creati o cancellati)."""
+    signature = rig_signature(arm)
+    cached = _rig_profiles.get(arm.name)
+    if cached and cached[0] == signature:
+        return cached[1], True
+    profile = RigProfile(arm)
+    _rig_profiles[arm.name] = (signature, profile)
+    return profile, False
+
+# Definizione track types (formato 0x12 = Hermite 16-bit)
+TRACK_DEFS = [
+    (0x001, "scale", 0, mot_codec.SCL_PRECISION),
+    (0x002, "scale", 1, mot_codec.SCL_PRECISION),
+    (0x004, "scale", 2, mot_codec.SCL_PRECISION),
+    (0x008, "rotation_euler", 0, mot_codec.ROT_PRECISION),
+    (0x010, "rotation_euler", 1, mot_codec.ROT_PRECISION),
+    (0x020, "rotation_euler", 2, mot_codec.ROT_PRECISION),
+    (0x040, "location", 0, mot_codec.LOC_PRECISION),
+    (0x080, "location", 1, mot_codec.LOC_PRECISION),
+    (0x100, "location", 2, mot_codec.LOC_PRECISION),
+]
+
+# (h_count, nome, nodi, forza ROT_X/Y/Z sui bones): FACE solo con export_face
+SECTIONS = [
+    (0x0A, "LOWER", range(0, 10), False),
+    (0x0C, "UPPER", range(10, 22), True),
+    (0x06, "FACE", range(22, 28), False),
+]
+
+# (fingerprint, with_report) -> (nodi già codificati, report) di una sezione:
+# se le fcurve che la alimentano non sono cambiate la sezione non viene
+# ricodificata. LRU solo in memoria: si svuota chiudendo Blender o con
+# Reload Scripts (nessuna copia su disco né nell'action).
+SECTION_CACHE_MAX = 64
+_section_cache = OrderedDict()
+
+def encode_section(h_count, node_specs, use_cache=True, with_report=True):
+    """(nodi, [TrackReport], hit) di una sezione: dalla cache se il
+    fingerprint (mot_codec.section_fingerprint) è già noto, altrimenti
+    build_nodes. with_report=False (né Quantization Report né Optimize
+    Keys) salta i TrackReport e quantization_error: report vuoto."""
+    key = (mot_codec.section_fingerprint(h_count, node_specs), with_report) if use_cache else None
+    cached = _section_cache.get(key)
+    if cached is not None:
+        _section_cache.move_to_end(key)
+        return cached + (True,)
+    report = [] if with_report else None
+    nodes = mot_codec.build_nodes(node_specs, report)
+    report = report or []
+    if use_cache:
+        _section_cache[key] = (nodes, report)
+        while len(_section_cache) > SECTION_CACHE_MAX:
+            _section_cache.popitem(last=False)
+    return nodes, report, False
+
+def size_summary(report):
+    """Riepilogo di Optimize Keys: track, key e byte (prima come 0x12 ->
+    dopo) per ogni scelta di formato."""
+    rows = {}
+    for r in report:
+        row = rows.setdefault(r.choice, [0, 0, 0, 0, 0])
+        for i, v in enumerate((1, r.keys_in, r.keys_out, r.size_in, r.size_out)):
+            row[i] += v
+    lines = ["", "="*60, "OPTIMIZE KEYS: size summary", "="*60]
+    for choice, (n, keys_in, keys_out, size_in, size_out) in sorted(rows.items()):
+        lines.append(f"  {choice:<9} {n:5d} tracks  keys {keys_in:7d} -> {keys_out:7d}  bytes {size_in:8d} -> {size_out:8d}")
+    size_in = sum(r.size_in for r in report)
+    size_out = sum(r.size_out for r in report)
+    saved = (size_in - size_out) / size_in * 100 if size_in else 0.0
+    lines.append(f"  total     {len(report):5d} tracks  bytes {size_in} -> {size_out} (-{saved:.1f}%)")
+    lines.append("="*60)
+    return "\n".join(lines)
+
+def clamp_warnings(report, clip=""):
+    """Una riga per ogni track con valori o tangenti tagliati a int16."""
+    lines = []
+    for r in report:
+        if r.clamped_values or r.clamped_tangents:
+            frames = ", ".join(str(f) for f in r.clamped_frames[:10]) + (", ..." if len(r.clamped_frames) > 10 else "")
+            lines.append(f"WARNING: {clip}Node{r.node} {mot_codec.TRACK_TYPES[r.track_id][0]}: {r.clamped_values} value(s) and "
+                         f"{r.clamped_tangents} tangent(s) clamped to int16 at frame(s) {frames} (max error {r.max_error:.4f})")
+    return lines
+
+def quantization_summary(report):
+    """Errore dopo la quantizzazione (file riletto come fa l'importer contro
+    le key di Blender) per tipo di canale: massimo (con il track peggiore),
+    RMS e pendenza delle tangenti, più i valori/tangenti tagliati."""
+    groups = {}
+    for r in report:
+        groups.setdefault(mot_codec.TRACK_TYPES[r.track_id][1], []).append(r)
+    lines = ["", "="*60, f"QUANTIZATION REPORT: {len(report)} tracks, {sum(r.keys_in for r in report)} keys", "="*60]
+    for prop, rows in sorted(groups.items()):
+        worst = max(rows, key=lambda r: r.max_error)
+        rms = (sum(r.sq_error for r in rows) / max(1, sum(r.keys_in for r in rows))) ** 0.5
+        lines.append(f"  {prop:<15} {len(rows):4d} tracks  max {worst.max_error:.6f} (Node{worst.node} {mot_codec.TRACK_TYPES[worst.track_id][0]})"
+                     f"  rms {rms:.6f}  slope max {max(r.slope_error for r in rows):.6f}")
+    clamped = [r for r in report if r.clamped_values or r.clamped_tangents]
+    lines.append(f"  clamped: {sum(r.clamped_values for r in report)} value(s), {sum(r.clamped_tangents for r in report)} tangent(s) in {len(clamped)} track(s)")
+    lines.append("="*60)
+    return "\n".join(lines)
+
+def find_export_armature():
+    """L'armatura del rig: Node2 (struttura standard) o Node0 (alternativa)."""
+    for name in ("Node2", "Node0"):
+        arm = bpy.data.objects.get(name)
+        if arm and arm.type == 'ARMATURE':
+            return arm
+    return None
+
+def current_actions(arm):
+    """Nome oggetto -> action attiva, per l'armatura e gli oggetti Node0/Node1."""
+    actions = {}
+    for obj in (arm, bpy.data.objects.get("Node0"), bpy.data.objects.get("Node1")):
+        if obj and obj.animation_data and obj.animation_data.action:
+            actions[obj.name] = obj.animation_data.action
+    return actions
+
+class MotSectionBuilder:
+    """Lettura delle fcurve per sezione, condivisa dall'export singolo e dal
+    batch export. Usa self._stats (mot_stats.RunStats) e self._fcurve_index."""
+    
+    def gather_sections(self, arm, profile, actions, frame_start, frame_end, export_face=False):
+        """Legge le fcurve di tutte le sezioni (main thread, bpy):
+        [(h_count, [(node_idx, [TrackSpec])])] per mot_codec.build_mot"""
+        log = self._stats.log
+        sections = []
+        for h_count, name, node_range, force_rotation in SECTIONS:
+            if h_count == 0x06 and not export_face:
+                continue
+            log("\n" + "="*60)
+            log(f"BUILDING {name} SECTION (Node{node_range[0]}-{node_range[-1]})")
+            log("="*60)
+            sections.append((h_count, self.build_section(arm, profile, actions, node_range, mot_codec.FORMAT_HERMITE_16, frame_start, frame_end, force_rotation)))
+        return sections
+    
+    def report_quantization(self, report, warnings=True):
+        """Contatori e (se non QUIET) riepilogo di quantization_summary, con
+        un warning per ogni track tagliato a int16."""
+        if not self.check_quantization:
+            return
+        stats = self._stats
+        stats.count("clamped_values", sum(r.clamped_values for r in report))
+        stats.count("clamped_tangents", sum(r.clamped_tangents for r in report))
+        if stats.verbosity == mot_stats.QUIET:
+            return
+        if warnings:
+            for line in clamp_warnings(report):
+                print(line)
+        print(quantization_summary(report))
+    
+    def fcurve_index(self, action):
+        """index_fcurves(action), costruito una volta per export e condiviso
+        dalle sezioni LOWER, UPPER e FACE."""
+        index = self._fcurve_index.get(action.name)
+        if index is None:
+            with self._stats.phase("lookup"):
+                index = self._fcurve_index[action.name] = index_fcurves(action)
+            self._stats.log(f"FCURVE INDEX: action '{action.name}', {len(index[0])} fcurves, {len(index[1])} animated bones")
+        return index
+    
+    def build_section(self, arm, profile, actions, node_range, format_type, frame_start, frame_end, force_rotation=False):
+        """Raccoglie i nodi di una sezione (LOWER, UPPER o FACE) come
+        [(node_idx, [TrackSpec])]: la codifica in byte è mot_codec.build_mot"""
+        stats = self._stats
+        log = stats.log
+        section_nodes = []
+        
+        # Pre-check: se Node0=armatura, controlla se Node2 ha già animazioni
+        node2_has_animations = False
+        node0_has_animations = False
+        
+        if profile.arm_is_node0 and arm.type == 'ARMATURE' and actions.get(arm.name):
+            bone_channels = self.fcurve_index(actions[arm.name])[1]
+            # Node2 (bone) e Node0 (bone, non l'oggetto armatura)
+            node2_has_animations = "Node2" in arm.pose.bones and "Node2" in bone_channels
+            node0_has_animations = "Node0" in arm.pose.bones and "Node0" in bone_channels
+            
+            if node0_has_animations and node2_has_animations:
+                log("\nWARNING: Both Node0 and Node2 have animations!")
+                log("  Node2 animations will be kept, Node0 animations will be ignored")
+            elif node0_has_animations and not node2_has_animations:
+                log("\nNOTE: Node0 has animations, Node2 is empty")
+                log("  Node0 animations will be moved to Node2 in the export")
+        
+        for node_idx in node_range:
+            node_name = f"Node{node_idx}"
+            
+            # Target e action dal profilo del rig (vedi RigProfile)
+            entry = profile.nodes.get(node_idx)
+            write_empty_node0 = False
+            use_node0_for_node2 = False
+            
+            if profile.arm_is_node0:
+                if node_idx == 0 and node0_has_animations and not node2_has_animations:
+                    # Node0 viene scritto vuoto se le sue animazioni vanno in Node2
+                    log(f"\n{node_name} (ARMATURE OBJECT - WILL BE FORCED EMPTY):")
+                    log(f"  Note: Animations will be moved to Node2")
+                    write_empty_node0 = True
+                elif node_idx == 0:
+                    # Node0 normale (o Node2 ha già animazioni)
+                    log(f"\n{node_name} (ARMATURE OBJECT):")
+                elif node_idx == 2 and node0_has_animations and not node2_has_animations:
+                    # Node2: usa animazioni Node0 solo se Node2 vuoto e Node0 pieno
+                    log(f"\n{node_name} (BONE - receives Node0 bone animations):")
+                    entry = profile.node2_from_node0
+                    use_node0_for_node2 = entry is not None
+                else:
+                    log(f"\n{node_name} (BONE):")
+            else:
+                log(f"\n{node_name}:")
+            
+            target, action = profile.resolve(entry, actions)
+            
+            if target:
+                log(f"  Target: {target.name if hasattr(target, 'name') else 'PoseBone'} ({entry.target_type})")
+                log(f"  Action: {action.name if action else 'NONE'}")
+                if use_node0_for_node2:
+                    log(f"  Using Node0 bone animations")
+            else:
+                log(f"  Target: NOT FOUND")
+            
+            # Raccogli i track per questo nodo
+            node_tracks = []
+            
+            for track_id, prop, axis, precision in TRACK_DEFS:
+                # Costruisci il data path
+                if target and hasattr(target, prop):
+                    if prop == "location":
+                        precision = entry.loc_precision
+                    data_path = entry.prefix + prop
+                    
+                    # Cerca fcurve nell'action
+                    fcurve = None
+                    if action:
+                        fcurve = self.fcurve_index(action)[0].get((data_path, axis))
+                    
+                    # Node3-21: forza sempre ROT_X, Y, Z
+                    is_rotation = prop == "rotation_euler"
+                    is_bone = node_idx >= 3 and node_idx <= 21
+                    
+                    has_keyframes = fcurve and len(fcurve.keyframe_points) > 0
+                    should_export = has_keyframes or (force_rotation and is_bone and is_rotation)
+                    
+                    track_name = mot_codec.TRACK_TYPES.get(track_id, (f"UNKNOWN_{track_id:03X}",))[0]
+                    
+                    if should_export:
+                        # Crea il track
+                        keyframes_to_export = None
+                        
+                        if has_keyframes:
+                            # Key nel range, lette in blocco dalla fcurve
+                            with stats.phase("sample"):
+                                valid_kf = sample_fcurve(fcurve, frame_start, frame_end)
+                            
+                            if len(valid_kf[0]) > 0:
+                                log(f"  {track_name}: {len(valid_kf[0])} keys")
+                                keyframes_to_export = valid_kf
+                            else:
+                                continue
+                        else:
+                            # Crea keyframes di default
+                            log(f"  {track_name}: DEFAULT")
+                            keyframes_to_export = None
+                        
+                        # Segno invertito (location facciali) e offset HD (Node2.LOC_Y)
+                        export_mult = entry.loc_mult if prop == "location" else 1.0
+                        export_offset = entry.loc_offset[axis] if prop == "location" else 0.0
+                        
+                        node_tracks.append(mot_codec.TrackSpec(track_id, format_type, keyframes_to_export, precision, frame_start, frame_end, export_offset, export_mult, self.optimize))
+            
+            # Scrivi il nodo
+            if write_empty_node0:
+                # Node0 sempre vuoto anche se ha track
+                log(f"  Node header: FORCED EMPTY")
+                node_tracks = []
+            elif node_tracks:
+                log(f"  Node header: tracks={len(node_tracks)}")
+            else:
+                log(f"  Node header: EMPTY")
+            section_nodes.append((node_idx, node_tracks))
+        
+        return section_nodes
+
+class EXPORT_OT_capcom_mot_v2(MotSectionBuilder, bpy.types.Operator, ExportHelper):
+    bl_idname = "export_anim.capcom_mot_v2"
+    bl_label = "Export Capcom (.mot)"
+    filename_ext = ".mot"
+    
+    use_loop: BoolProperty(
+        name="Enable Loop",
+        description="Enable animation loop (ignored if 'Auto Loop from Import' is checked)",
+        default=False,
+    )
+    
+    loop_frame: IntProperty(
+        name="Loop Frame",
+        description="Frame where loop starts (ignored if 'Auto Loop from Import' is checked)",
+        default=0,
+        min=0,
+    )
+    
+    auto_loop: BoolProperty(
+        name="Auto Loop (from Import)",
+        description="Read loop/loop_frame automatically from the action's saved import data, ignoring the fields above",
+        default=True,
+    )
+    
+    export_face: BoolProperty(
+        name="Export Face (Node23-27)",
+        description="Include facial animation section (0x06) in the export",
+        default=False,
+    )
+    
+    check_quantization: BoolProperty(
+        name="Quantization Report",
+        description="After encoding, read the tracks back like the importer and report max/RMS error against the Blender curves and every value or tangent clamped to int16",
+        default=True,
+    )
+    
+    optimize: BoolProperty(
+        name="Optimize Keys",
+        description="Pick the smallest key format per track: constant channels become 2 keys, flat tangents use 0x11 (4 bytes/key), values or tangents beyond int16 use 0x22 (float) instead of being clamped",
+        default=False,
+    )
+    
+    use_cache: BoolProperty(
+        name="Section Cache",
+        description="Reuse the encoded LOWER/UPPER/FACE sections whose curves, frame range and offsets are unchanged since a previous export. Kept in memory only: cleared when Blender restarts or on Reload Scripts",
+        default=True,
+    )
+    
+    verbosity: EnumProperty(
+        name="Console Log",
+        items=mot_stats.VERBOSITY_ITEMS,
+        default=mot_stats.FULL,
+    )
+    
+    profile: BoolProperty(
+        name="Profile (cProfile)",
+        description="Run the export under cProfile (top functions in the summary, or a .prof file next to the Stats JSON)",
+        default=False,
+    )
+    
+    stats_path: StringProperty(
+        name="Stats JSON",
+        description="Also write phase timings and counters to this JSON file (empty = don't write)",
+        default="",
+        subtype='FILE_PATH',
+    )
+
+    def execute(self, context):
+        # Tempi per fase, contatori e log per nodo/track (vedi mot_stats)
+        self._stats = mot_stats.RunStats(f"EXPORT {os.path.basename(self.filepath)}", self.verbosity, self.profile)
+        self._fcurve_index = {}
+        try:
+            with self._stats.profiling():
+                return self.export(context)
+        finally:
+            self._stats.finish(bpy.path.abspath(self.stats_path) or None)
+
+    def export(self, context):
+        stats = self._stats
+        log = stats.log
+        log("\n" + "="*60)
+        log("EXPORTING ANIMATION")
+        log("="*60)
+        
+        # Cerca l'armatura - può essere Node2 o Node0
+        arm = find_export_armature()
+        if not arm:
+            self.report({'ERROR'}, "No armature found (searched Node2 and Node0)")
+            return {'CANCELLED'}
+        if arm.name == "Node0":
+            log("STRUCTURE: Node0 is ARMATURE (alternative structure)")
+        else:
+            log("STRUCTURE: Node2 is ARMATURE (standard structure)")
+        
+        log(f"Armature: {arm.name}")
+        
+        # ====== AUTO LOOP (read from action custom properties) ======
+        # Se auto_loop è attivo, prova a leggere "capcom_loop" e
+        # "capcom_loop_frame" dalla custom property dell'action corrente
+        # (salvate dall'importer v1.13+). Se non trovate, usa i valori
+        # manuali use_loop/loop_frame come fallback.
+        effective_use_loop = self.use_loop
+        effective_loop_frame = self.loop_frame
+        
+        if self.auto_loop:
+            action = arm.animation_data.action if arm.animation_data else None
+            if action and "capcom_loop" in action and "capcom_loop_frame" in action:
+                effective_use_loop = bool(action["capcom_loop"])
+                effective_loop_frame = int(action["capcom_loop_frame"])
+                log(f"AUTO LOOP: read from action '{action.name}' -> loop={effective_use_loop}, loop_frame={effective_loop_frame}")
+            else:
+                log(f"AUTO LOOP: no saved loop data on action, falling back to manual fields (loop={effective_use_loop}, loop_frame={effective_loop_frame})")
+        # ===============================================
+        
+        # ====== NODE1/NODE2 BONE STRUCTURE DETECTION (HD models) ======
+        # Se Node1 e Node2 sono entrambi bones (HD model), l'importer NON
+        # fa più alcun redirect: ogni bone scrive sulle proprie keyframe.
+        # L'unica correzione rimasta è su Node2.LOC_Y, che in Blender viene
+        # mostrato con un offset visivo di -node2_y_offset (per evitare che
+        # il modello "voli", dato che Node2 ha use_connect=False e la sua
+        # location è relativa all'head in rest pose). In export sommiamo
+        # +node2_y_offset SOLO a Node2.LOC_Y per ripristinare il valore
+        # originale che il gioco si aspetta. Tutti gli altri canali
+        # (Node1.LOC_X/Z, Node2.LOC_X/Z, rotazioni, scale) sono invariati.
+        with stats.phase("structure"):
+            profile, cached = rig_profile(arm)
+        log(f"STRUCTURE PROFILE: {'cached' if cached else 'computed'}")
+        
+        if profile.node1_node2_are_bones:
+            log("STRUCTURE: HD model (Node1 and Node2 are BONES)")
+            log(f"  -> No redirect: Node1 and Node2 export their own keyframes")
+            log(f"  -> Node2.LOC_Y offset restore: +{profile.node2_y_offset:.4f}")
+        else:
+            log("STRUCTURE: STANDARD model (Node1/Node2 are separate objects)")
+        
+        # Trova il frame range
+        frame_start = int(context.scene.frame_start)
+        frame_end = int(context.scene.frame_end)
+        
+        log(f"Frame range: {frame_start} → {frame_end}")
+        log(f"Loop: {effective_use_loop}, Loop Frame: {effective_loop_frame}")
+        
+        sections = self.gather_sections(arm, profile, current_actions(arm), frame_start, frame_end, self.export_face)
+        mot = mot_codec.MotFile()
+        report = []
+        for h_count, node_specs in sections:
+            with stats.phase("encode"):
+                nodes, section_report, hit = encode_section(h_count, node_specs, self.use_cache,
+                                                            self.check_quantization or self.optimize)
+            mot.sections.append(mot_codec.Section.from_nodes(h_count, nodes, effective_use_loop, effective_loop_frame))
+            report += section_report
+            if hit:
+                stats.count("cache_hits")
+                log(f"\nSECTION CACHE HIT: {mot.sections[-1].name} curves unchanged, encoded nodes reused")
+        
+        if self.optimize:
+            log("\nOPTIMIZE KEYS:")
+            for r in report:
+                if r.choice != mot_codec.CHOICE_HERMITE:
+                    log(f"  Node{r.node} {mot_codec.TRACK_TYPES[r.track_id][0]}: {r.choice}, {r.keys_in} -> {r.keys_out} keys, {r.size_in} -> {r.size_out} bytes")
+            if stats.verbosity != mot_stats.QUIET:
+                print(size_summary(report))
+        
+        self.report_quantization(report)
+        
+        for section in mot.sections:
+            log(f"\n{section.name} header: type=0x{section.h_type:08X}, count={section.h_count}, size={section.h_size}")
+            log(f"{section.name} section: {section.h_size - 20} bytes")
+            for node in section.nodes:
+                stats.count("nodes")
+                stats.count("tracks", len(node.tracks))
+                stats.count("keys", sum(t.t_keys for t in node.tracks))
+        
+        # Salva file
+        try:
+            with stats.phase("write"):
+                file_data = mot.serialize()
+                with open(self.filepath, "wb") as f:
+                    f.write(file_data)
+            stats.count("bytes", len(file_data))
+            
+            log("\n" + "="*60)
+            log(f"EXPORT COMPLETE")
+            log(f"File: {self.filepath}")
+            log(f"Total: {len(file_data)} bytes")
+            for section in mot.sections:
+                log(f"{section.name}: {section.h_size - 20} bytes")
+            log("="*60 + "\n")
+            
+            self.report({'INFO'}, f"Export successful: {len(file_data)} bytes")
+            return {'FINISHED'}
+            
+        except Exception as e:
+            print(f"ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            self.report({'ERROR'}, f"Export failed: {e}")
+            return {'CANCELLED'}
+    
+def clip_actions(arm, action):
+    """Nome oggetto -> action per esportare la clip action: l'armatura usa
+    action, gli oggetti separati Node0/Node1 le action "<clip>_<NodeN>"
+    create dal batch import, se esistono."""
+    actions = {arm.name: action}
+    for name in ("Node0", "Node1"):
+        companion = bpy.data.actions.get(f"{action.name}_{name}")
+        if name != arm.name and companion and bpy.data.objects.get(name):
+            actions[name] = companion
+    return actions
+
+def batch_clips(pattern="*"):
+    """Action da esportare come clip (nome che corrisponde a pattern),
+    ordinate per nome. Le action "<clip>_Node0/1" degli oggetti separati
+    non sono clip: vengono esportate insieme alla loro clip."""
+    names = {a.name for a in bpy.data.actions}
+    clips = []
+    for action in bpy.data.actions:
+        base, _, suffix = action.name.rpartition("_")
+        if suffix in ("Node0", "Node1") and base in names:
+            continue
+        if fnmatchcase(action.name, pattern):
+            clips.append(action)
+    return sorted(clips, key=lambda a: a.name)
+
+def _encode_here(name, path, args):
+    try:
+        return name, path, mot_codec.encode_mot(*args), None
+    except Exception as e:
+        return name, path, None, e
+
+def encode_clips(clips, workers=0):
+    """Genera (name, path, (bytes, report) o None, errore) nell'ordine di clips, un
+    iterabile di (name, path, args di mot_codec.encode_mot, errore) che viene
+    consumato qui, sul main thread (la raccolta delle fcurve usa bpy).
+    La codifica gira in un process pool (workers=0: un processo per CPU,
+    1: nel processo corrente); al massimo 2 clip per worker restano in
+    attesa, così si raccoglie la clip successiva mentre i worker codificano."""
+    clips = iter(clips)
+    pool = None
+    if workers != 1:
+        try:
+            # spawn: mai fare fork del processo di Blender
+            pool = ProcessPoolExecutor(max_workers=workers or None, mp_context=multiprocessing.get_context("spawn"))
+        except (OSError, ValueError, NotImplementedError) as e:
+            print(f"  -> Process pool unavailable ({e}), encoding in Blender's process")
+    if pool is None:
+        for name, path, args, error in clips:
+            yield (name, path, None, error) if error is not None else _encode_here(name, path, args)
+        return
+    
+    def submit(clip):
+        name, path, args, error = clip
+        return clip, (pool.submit(mot_codec.encode_mot, *args) if error is None else None)
+    
+    pending = deque()
+    try:
+        for clip in islice(clips, 2 * (workers or os.cpu_count() or 1)):
+            pending.append(submit(clip))
+        while pending:
+            (name, path, args, error), future = pending.popleft()
+            if future is None:
+                result = (name, path, None, error)
+            else:
+                try:
+                    result = (name, path, future.result(), None)
+                except BrokenProcessPool:
+                    # es. un worker che non riesce a partire: si prosegue qui
+                    print("  -> Process pool broken, encoding the remaining clips in Blender's process")
+                    for name, path, args, error in [(name, path, args, error)] + [c for c, _ in pending] + list(clips):
+                        yield (name, path, None, error) if error is not None else _encode_here(name, path, args)
+                    return
+                except Exception as e:
+                    result = (name, path, None, e)
+            for clip in islice(clips, 1):
+                pending.append(submit(clip))
+            yield result
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+class EXPORT_OT_capcom_mot_batch(MotSectionBuilder, bpy.types.Operator):
+    """Export every action (or those matching a name pattern) to a folder, one .mot per action"""
+    bl_idname = "export_anim.capcom_mot_batch"
+    bl_label = "Export Capcom Batch (.mot)"
+    
+    directory: StringProperty(subtype='DIR_PATH')
+    filter_glob: StringProperty(default="*.mot", options={'HIDDEN'})
+    
+    action_filter: StringProperty(
+        name="Actions",
+        description="Only export actions whose name matches this pattern, e.g. em0_* (* = every action)",
+        default="*",
+    )
+    
+    export_face: BoolProperty(
+        name="Export Face (Node23-27)",
+        description="Include facial animation section (0x06) in the export",
+        default=False,
+    )
+    
+    check_quantization: BoolProperty(
+        name="Quantization Report",
+        description="After encoding, read the tracks back like the importer and report max/RMS error against the Blender curves and every value or tangent clamped to int16",
+        default=True,
+    )
+    
+    optimize: BoolProperty(
+        name="Optimize Keys",
+        description="Pick the smallest key format per track: constant channels become 2 keys, flat tangents use 0x11 (4 bytes/key), values or tangents beyond int16 use 0x22 (float) instead of being clamped",
+        default=False,
+    )
+    
+    workers: IntProperty(
+        name="Encode Processes",
+        description="Processes encoding clips in parallel (0 = one per CPU, 1 = encode inside Blender)",
+        default=0,
+        min=0,
+    )
+    
+    verbosity: EnumProperty(
+        name="Console Log",
+        items=mot_stats.VERBOSITY_ITEMS,
+        default=mot_stats.SUMMARY,
+    )
+    
+    profile: BoolProperty(
+        name="Profile (cProfile)",
+        description="Run the export under cProfile (top functions in the summary, or a .prof file next to the Stats JSON)",
+        default=False,
+    )
+    
+    stats_path: StringProperty(
+        name="Stats JSON",
+        description="Also write phase timings and counters to this JSON file (empty = don't write)",
+        default="",
+        subtype='FILE_PATH',
+    )
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        self._stats = mot_stats.RunStats("BATCH EXPORT", self.verbosity, self.profile)
+        self._fcurve_index = {}
+        try:
+            with self._stats.profiling():
+                return self.export_batch(context)
+        finally:
+            self._stats.finish(bpy.path.abspath(self.stats_path) or None)
+
+    def gather_clip(self, arm, profile, action):
+        """Argomenti di mot_codec.encode_mot per una clip (sections, loop,
+        loop_frame, with_report): frame range e capcom_loop/capcom_loop_frame
+        vengono dall'action stessa."""
+        frame_start, frame_end = (int(round(f)) for f in action.frame_range)
+        loop = bool(action.get("capcom_loop", False))
+        loop_frame = int(action.get("capcom_loop_frame", 0))
+        self._stats.log(f"\nCLIP {action.name}: frames {frame_start} → {frame_end}, loop={loop} ({loop_frame})")
+        # un indice per clip: la memoria non cresce col numero di action
+        self._fcurve_index = {}
+        actions = clip_actions(arm, action)
+        sections = self.gather_sections(arm, profile, actions, frame_start, frame_end, self.export_face)
+        return sections, loop, loop_frame, self.check_quantization or self.optimize
+
+    def iter_clips(self, arm, profile, clips):
+        for action in clips:
+            path = os.path.join(self.directory, bpy.path.clean_name(action.name) + ".mot")
+            if len(action.fcurves) == 0:
+                yield action.name, path, None, "no F-Curves (library clip not loaded?)"
+                continue
+            args, error = None, None
+            try:
+                args = self.gather_clip(arm, profile, action)
+            except Exception as e:
+                error = e
+            yield action.name, path, args, error
+
+    def export_batch(self, context):
+        stats = self._stats
+        if not os.path.isdir(self.directory):
+            self.report({'ERROR'}, f"Not a folder: {self.directory}")
+            return {'CANCELLED'}
+        arm = find_export_armature()
+        if not arm:
+            self.report({'ERROR'}, "No armature found (searched Node2 and Node0)")
+            return {'CANCELLED'}
+        clips = batch_clips(self.action_filter or "*")
+        if not clips:
+            self.report({'WARNING'}, f"No actions match '{self.action_filter}'")
+            return {'CANCELLED'}
+        
+        print("\n" + "="*60)
+        print(f"BATCH EXPORT: {len(clips)} action(s) -> {self.directory}")
+        print("="*60)
+        with stats.phase("structure"):
+            profile, cached = rig_profile(arm)
+        
+        wm = context.window_manager
+        wm.progress_begin(0, len(clips))
+        exported, failed = 0, 0
+        report = []
+        try:
+            workers = 1 if len(clips) == 1 else self.workers
+            for n, (name, path, encoded, error) in enumerate(encode_clips(self.iter_clips(arm, profile, clips), workers), 1):
+                if error is not None:
+                    print(f"[{n}/{len(clips)}] FAILED {name}: {error}")
+                    failed += 1
+                    continue
+                data, clip_report = encoded
+                report += clip_report
+                if self.check_quantization and stats.verbosity != mot_stats.QUIET:
+                    for line in clamp_warnings(clip_report, f"{name} "):
+                        print(line)
+                with stats.phase("write"):
+                    with open(path, "wb") as f:
+                        f.write(data)
+                stats.count("clips")
+                stats.count("bytes", len(data))
+                exported += 1
+                if stats.verbosity != mot_stats.QUIET:
+                    print(f"[{n}/{len(clips)}] {name} -> {os.path.basename(path)}: {len(data)} bytes")
+                wm.progress_update(n)
+        finally:
+            wm.progress_end()
+        
+        if self.optimize and stats.verbosity != mot_stats.QUIET:
+            print(size_summary(report))
+        self.report_quantization(report, warnings=False)
+        if failed:
+            self.report({'WARNING'}, f"Exported {exported} clip(s), {failed} failed (see console)")
+        else:
+            self.report({'INFO'}, f"Exported {exported} clip(s)")
+        return {'FINISHED'} if exported else {'CANCELLED'}
+
+def menu_func_export(self, context):
+    self.layout.operator(EXPORT_OT_capcom_mot_v2.bl_idname, text="Capcom Outbreak (.mot)")
+    self.layout.operator(EXPORT_OT_capcom_mot_batch.bl_idname, text="Capcom Outbreak Batch (.mot)")
+
+def register():
+    bpy.utils.register_class(EXPORT_OT_capcom_mot_v2)
+    bpy.utils.register_class(EXPORT_OT_capcom_mot_batch)
+    bpy.types.TOPBAR_MT_file_export.append(menu_func_export)
+
+def unregister():
+    bpy.utils.unregister_class(EXPORT_OT_capcom_mot_v2)
+    bpy.utils.unregister_class(EXPORT_OT_capcom_mot_batch)
+    bpy.types.TOPBAR_MT_file_export.remove(menu_func_export)
@@ -0,0 +1,42 @@
+bl_info = {
+    "name": "Mot-Break: Capcom Outbreak Animation (.mot)",
+    "author": "Gemini & User, CarlVercetti & Claude",
+    "version": (0, 8, 0),
+    "blender": (3, 0, 0),
+    "location": "File > Import > Outbreak Import (.mot), File > Export > Capcom Outbreak (.mot)",
+    "description": "Importer V1.13 and Exporter V2.11 with the shared .mot codec, decode cache and stats",
+    "category": "Import-Export",
+}
+
+import importlib
+import sys
+
+# Moduli del package in ordine di dipendenza. L'importer e l'exporter (bpy)
+# vengono importati solo in register(): mot_codec, mot_cache e mot_stats
+# restano utilizzabili senza Blender (tool da riga di comando, worker del
+# process pool, test) con "from motbreak import mot_codec".
+_MODULES = ("mot_codec", "mot_stats", "mot_cache", "Capcom_Mot_importer", "Mot_Exporter_Standalone")
+
+def _load_modules():
+    """Importa i moduli del package; quelli già importati vengono ricaricati
+    (F3 -> Reload Scripts ricarica solo questo __init__)."""
+    modules = []
+    for name in _MODULES:
+        module = sys.modules.get(f"{__name__}.{name}")
+        if module is None:
+            module = importlib.import_module(f".{name}", __name__)
+        else:
+            module = importlib.reload(module)
+        modules.append(module)
+    return modules
+
+def register():
+    for module in _load_modules():
+        if hasattr(module, "register"):
+            module.register()
+
+def unregister():
+    for name in reversed(_MODULES):
+        module = sys.modules.get(f"{__name__}.{name}")
+        if module is not None and hasattr(module, "unregister"):
+            module.unregister()
@@ -0,0 +1,190 @@
+"""
+On-disk cache of decoded .mot tracks (no bpy, needs numpy).
+
+An entry holds what mot_codec.decode_file() returns for a whole file
+(every track with keys, loop metadata) as one uncompressed .npz. Entries
+are keyed by a hash of the file content plus a settings tag (cache
+format, mot_codec.DECODER_VERSION, codec precisions and node layout), so
+an entry is never used after the file or the decoder changes: it simply
+stops being found and ages out.
+
+The cache is bounded by total size: on every store the least recently
+used entries (oldest mtime; a hit touches the entry) are deleted until
+the directory is under max_bytes.
+
+Usage (from the folder that contains motbreak/):
+  python -m motbreak.mot_cache cache_dir          (list entries and size)
+  python -m motbreak.mot_cache cache_dir --clear  (delete all entries)
+"""
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+from . import mot_codec
+
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_EXT = ".npz"
+
+
+def settings_tag():
+    """Everything besides the file content that changes the decoded arrays."""
+    return repr((
+        CACHE_FORMAT, mot_codec.DECODER_VERSION,
+        mot_codec.ROT_PRECISION, mot_codec.LOC_PRECISION, mot_codec.SCL_PRECISION,
+        mot_codec.FACE_PRECISION, mot_codec.FACE_PRECISION_ALT,
+        sorted(mot_codec.TRACK_TYPES.items()), sorted(mot_codec.SECTION_LAYOUT.items()),
+        mot_codec.HANDS_FIRST_NODES,
+    )).encode()
+
+
+def _to_arrays(decoded):
+    tracks = decoded.tracks
+    meta = np.array([(t.section, t.node, t.track_id, len(t.keys.frames)) for t in tracks],
+                    dtype=np.int64).reshape(-1, 4)
+
+    def column(i, dtype):
+        if not tracks:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate([np.asarray(t.keys[i], dtype=dtype) for t in tracks])
+
+    return {
+        "meta": meta,
+        "precision": np.array([t.precision for t in tracks], dtype=np.float64),
+        "frames": column(0, np.int32),
+        "values": column(1, np.float64),
+        "c0": column(2, np.float64),
+        "c1": column(3, np.float64),
+        "loop": np.array([decoded.loop, decoded.loop_frame], dtype=np.int64),
+    }
+
+
+def _from_arrays(arrays, filepath):
+    frames, values, c0, c1 = (arrays[k] for k in ("frames", "values", "c0", "c1"))
+    tracks = []
+    start = 0
+    for (section, node, track_id, n_keys), div in zip(arrays["meta"].tolist(), arrays["precision"].tolist()):
+        end = start + n_keys
+        keys = mot_codec.TrackArrays(frames[start:end], values[start:end], c0[start:end], c1[start:end])
+        tracks.append(mot_codec.DecodedTrack(section, node, track_id, div, keys))
+        start = end
+    has_loop, loop_frame = arrays["loop"].tolist()
+    return mot_codec.DecodedMot(filepath, bool(has_loop), int(loop_frame), tracks)
+
+
+class DecodeCache:
+    """Content-addressed cache of decoded .mot files in a directory."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._tag = settings_tag()
+
+    def key(self, data):
+        h = hashlib.blake2b(digest_size=20)
+        h.update(self._tag)
+        h.update(data)
+        return h.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key + ENTRY_EXT)
+
+    def lookup(self, filepath):
+        """(key, DecodedMot o None, contenuto del file). Il file viene letto
+        una volta per calcolarne l'hash: su un hit non viene fatto nessun
+        parse, su un miss il chiamante decodifica dai byte già letti."""
+        with open(filepath, "rb") as f:
+            data = f.read()
+        key = self.key(data)
+        path = self.entry_path(key)
+        if not os.path.exists(path):
+            return key, None, data
+        try:
+            with np.load(path) as npz:
+                decoded = _from_arrays({k: npz[k] for k in npz.files}, filepath)
+        except (OSError, ValueError, KeyError):
+            # entry rotta (es. scrittura interrotta): si rimuove e si ridecodifica
+            self._remove(path)
+            return key, None, data
+        os.utime(path)  # LRU: l'entry appena usata è la più recente
+        return key, decoded, data
+
+    def store(self, key, decoded):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.entry_path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **_to_arrays(decoded))
+        os.replace(tmp, path)
+        self.evict()
+
+    def entries(self):
+        """[(path, size, mtime)] dal meno al più recentemente usato."""
+        if not os.path.isdir(self.directory):
+            return []
+        out = []
+        for name in os.listdir(self.directory):
+            if name.endswith(ENTRY_EXT):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                out.append((path, st.st_size, st.st_mtime))
+        out.sort(key=lambda e: e[2])
+        return out
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        return total
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def select(decoded, skip_face=False, nodes=None, frame_window=None):
+    """Applica ignore_face / selezione di nodi / finestra di frame a un
+    DecodedMot completo (come iter_decoded_tracks su un file)."""
+    face = mot_codec.NODE_PRESETS["FACE"]
+    tracks = []
+    for t in decoded.tracks:
+        if skip_face and t.node in face:
+            continue
+        if nodes is not None and t.node not in nodes:
+            continue
+        if frame_window is not None:
+            keys = mot_codec.window_keys(t.keys, frame_window)
+            if keys is None:
+                continue
+            t = t._replace(keys=keys)
+        tracks.append(t)
+    return decoded._replace(tracks=tracks)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    cache = DecodeCache(sys.argv[1])
+    if "--clear" in sys.argv[2:]:
+        cache.clear()
+    entries = cache.entries()
+    for path, size, _ in entries:
+        print(f"{size:10d}  {os.path.basename(path)}")
+    print(f"{len(entries)} entries, {sum(e[1] for e in entries)} bytes")
@@ -0,0 +1,1015 @@
+"""
+Capcom Outbreak .mot codec (no bpy).
+
+Parses and writes the .mot animation layout used by the importer, the
+exporter and the debug importers, so it can be used both inside Blender
+and from plain Python batch tools.
+
+Layout (little endian):
+  Section header (20 bytes): h_type, h_count, h_size, h_loop, h_loopFrame
+  Node header    (12 bytes): n_type, n_sub, n_size
+                             (n_type < 0x80000000 = invalid node, 4 bytes)
+  Track header   (12 bytes): t_type, t_keys, t_size
+  Keys: 0x11 -> <hh   (value, frame)             4 bytes
+        0x12 -> <hhhh (value, frame, c0, c1)     8 bytes
+        0x22 -> <ffff (value, frame, c0, c1)    16 bytes
+
+Parsing works over a memoryview: track key data is a slice of the
+original buffer and is only copied when serialized. With compact=True
+(the default of load()) key data is copied into array('h') / array('f')
+instead, so a decoded library costs about its on-disk size and the file
+buffers can be released. With lazy=True load() only reads the section,
+node and track headers; key data is read from disk the first time a
+track's data is accessed.
+
+decode_track() turns a whole track into arrays in one step (NumPy when
+available, as in Blender; plain lists otherwise).
+"""
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:
+    import numpy as np
+except ImportError:  # il codec funziona anche senza numpy (più lento)
+    np = None
+
+SECTION_HEADER = struct.Struct("<IIIIf")  # h_type, h_count, h_size, h_loop, h_loopFrame
+NODE_HEADER = struct.Struct("<III")       # n_type, n_sub, n_size
+TRACK_HEADER = struct.Struct("<III")      # t_type, t_keys, t_size
+INVALID_NODE = struct.Struct("<I")        # n_type only
+
+SECTION_TYPE = 0x80000002
+NODE_ACTIVE = 0x80000000
+TRACK_ACTIVE = 0x80000000
+
+FORMAT_LINEAR_16 = 0x11
+FORMAT_HERMITE_16 = 0x12
+FORMAT_HERMITE_FLOAT = 0x22
+
+# typecode dei campi interleaved di una key (compact=True)
+KEY_TYPECODES = {
+    FORMAT_LINEAR_16: "h",
+    FORMAT_HERMITE_16: "h",
+    FORMAT_HERMITE_FLOAT: "f",
+}
+
+KEY_STRUCTS = {
+    FORMAT_LINEAR_16: struct.Struct("<hh"),
+    FORMAT_HERMITE_16: struct.Struct("<hhhh"),
+    FORMAT_HERMITE_FLOAT: struct.Struct("<ffff"),
+}
+
+# Versione della decodifica (decode_track / iter_decoded_tracks): va
+# incrementata a ogni modifica che cambia gli array decodificati, così le
+# entry della cache di decodifica (mot_cache) fatte prima non valgono più
+DECODER_VERSION = 1
+
+ROT_PRECISION = 2607.5945876
+LOC_PRECISION = 16.0
+SCL_PRECISION = 16.0
+FACE_PRECISION = 256.0      # Node23, Node25, Node27
+FACE_PRECISION_ALT = 512.0  # Node24, Node26
+
+TRACK_TYPES = {
+    0x001: ("SCL_X", "scale", 0),
+    0x002: ("SCL_Y", "scale", 1),
+    0x004: ("SCL_Z", "scale", 2),
+    0x008: ("ROT_X", "rotation_euler", 0),
+    0x010: ("ROT_Y", "rotation_euler", 1),
+    0x020: ("ROT_Z", "rotation_euler", 2),
+    0x040: ("LOC_X", "location", 0),
+    0x080: ("LOC_Y", "location", 1),
+    0x100: ("LOC_Z", "location", 2),
+}
+
+if np is not None:
+    KEY_DTYPES = {
+        FORMAT_LINEAR_16: np.dtype([("value", "<i2"), ("frame", "<i2")]),
+        FORMAT_HERMITE_16: np.dtype([("value", "<i2"), ("frame", "<i2"), ("c0", "<i2"), ("c1", "<i2")]),
+        FORMAT_HERMITE_FLOAT: np.dtype([("value", "<f4"), ("frame", "<f4"), ("c0", "<f4"), ("c1", "<f4")]),
+    }
+else:
+    KEY_DTYPES = {}
+
+# Track decodificata: frames (int), values (float, già divisi per la
+# precisione), c0/c1 (tangenti grezze come nel file, 0 per 0x11)
+class TrackArrays(namedtuple("TrackArrays", "frames values c0 c1")):
+    __slots__ = ()
+
+    def rows(self):
+        """Key per key come tuple di scalari Python (frame, value, c0, c1)."""
+        cols = [a.tolist() if hasattr(a, "tolist") else a for a in self]
+        return zip(*cols)
+
+
+# section byte (h_count & 0xFF) -> (name, first node index)
+SECTION_LAYOUT = {
+    0x0A: ("LOWER", 0),
+    0x0C: ("UPPER", 10),
+    0x06: ("FACE", 22),
+}
+HANDS_SECTION = 0x04
+HANDS_FIRST_NODES = (28, 32)  # prima 0x04 = Node28-31, seconda 0x04 = Node32-35
+
+# Preset per parse_node_mask: nome -> nodi
+NODE_PRESETS = {
+    "LOWER": range(0, 10),
+    "UPPER": range(10, 22),
+    "FACE": range(22, 28),
+    "HANDS": range(28, 36),
+    "HANDS_L": range(28, 32),
+    "HANDS_R": range(32, 36),
+}
+
+
+class MotFormatError(ValueError):
+    """Raised when a .mot buffer can't be walked (header out of bounds)."""
+
+
+def key_size(format_type):
+    """Byte size of a single key for the given track format."""
+    return 16 if format_type == FORMAT_HERMITE_FLOAT else (8 if format_type == FORMAT_HERMITE_16 else 4)
+
+
+def parse_node_mask(text):
+    """Insieme di nodi da una selezione come "UPPER", "HANDS", "10-21" o
+    "0,3,Node28-31" (preset di NODE_PRESETS, indici e range separati da
+    virgole o spazi). None se la stringa è vuota (= tutti i nodi)."""
+    nodes = set()
+    for part in re.split(r"[,;\s]+", (text or "").strip()):
+        if not part:
+            continue
+        if part.upper() in NODE_PRESETS:
+            nodes.update(NODE_PRESETS[part.upper()])
+            continue
+        m = re.fullmatch(r"(?:node)?(\d+)(?:-(?:node)?(\d+))?", part, re.IGNORECASE)
+        if not m:
+            raise ValueError(f"invalid node selection {part!r} (use {', '.join(NODE_PRESETS)}, 5 or 10-21)")
+        lo, hi = int(m.group(1)), int(m.group(2) or m.group(1))
+        nodes.update(range(min(lo, hi), max(lo, hi) + 1))
+    return frozenset(nodes) if nodes else None
+
+
+def track_precision(node_idx, prop):
+    """Divisore usato dall'importer per un canale (negativo per le
+    location facciali Node23-27, segno invertito su tutti gli assi)."""
+    if prop == "location" and 23 <= node_idx <= 27:
+        return -(FACE_PRECISION_ALT if node_idx in (24, 26) else FACE_PRECISION)
+    if prop == "scale":
+        return SCL_PRECISION
+    if prop == "location":
+        return LOC_PRECISION
+    return ROT_PRECISION
+
+
+class _LazySource:
+    """File .mot letto solo negli header durante il parse (lazy=True).
+    Le key vengono lette dal disco alla prima richiesta, con un'unica
+    lettura del file condivisa da tutti i track."""
+
+    WINDOW = 64 * 1024
+
+    __slots__ = ("path", "size", "_f", "_buf", "_win", "_win_start")
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "rb")
+        self.size = os.fstat(self._f.fileno()).st_size
+        self._buf = None
+        self._win = b""
+        self._win_start = 0
+
+    def __len__(self):
+        return self.size
+
+    def _read(self, start, length):
+        # Gli header vengono letti a finestre di WINDOW byte: un file
+        # piccolo costa una sola read, uno grande salta le key non lette
+        end = start + length
+        if not (self._win_start <= start and end <= self._win_start + len(self._win)):
+            self._f.seek(start)
+            self._win = self._f.read(max(length, self.WINDOW))
+            self._win_start = start
+        return self._win, start - self._win_start
+
+    def unpack(self, st, offset):
+        if self._buf is not None:
+            return st.unpack_from(self._buf, offset)
+        win, pos = self._read(offset, st.size)
+        return st.unpack_from(win, pos)
+
+    def __getitem__(self, sl):
+        if self._buf is None and self._f is not None:
+            # durante il parse: solo il range richiesto (byte extra)
+            length = max(0, sl.stop - sl.start)
+            win, pos = self._read(sl.start, length)
+            return win[pos:pos + length]
+        return self.load()[sl]
+
+    def load(self):
+        if self._buf is None:
+            with open(self.path, "rb") as f:
+                self._buf = memoryview(f.read())
+        return self._buf
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        self._win = b""
+
+
+def _unpack(st, buf, offset):
+    if offset < 0 or offset + st.size > len(buf):
+        raise MotFormatError(f"header at 0x{offset:08X} exceeds buffer size {len(buf)}")
+    if isinstance(buf, _LazySource):
+        return buf.unpack(st, offset)
+    return st.unpack_from(buf, offset)
+
+
+def _nbytes(data):
+    return memoryview(data).nbytes
+
+
+def _compact(data, format_type):
+    """Copia owned delle key come array('h') / array('f') (little endian)."""
+    a = array(KEY_TYPECODES.get(format_type, "h"))
+    data = bytes(data)
+    if len(data) % a.itemsize:
+        return data  # key troncata a fine file: resta così com'è
+    a.frombytes(data)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+def decode_track(track, div=None):
+    """Decodifica tutte le key di un track in una volta sola.
+    Stessa matematica dell'importer: value / div per i formati int16,
+    value float invariato e frame troncato a int per 0x22.
+    div=None usa la precisione salvata sul track in fase di parse (un id
+    fuori da TRACK_TYPES non ne ha: valori non scalati). Un track troncato
+    a fine file decodifica solo le key complete, come Track.keys."""
+    fmt = track.format_type
+    if div is None:
+        div = track.precision if track.precision is not None else 1.0
+    if np is not None:
+        dtype = KEY_DTYPES.get(fmt, KEY_DTYPES[FORMAT_LINEAR_16])
+        count = min(track.t_keys, _nbytes(track.data) // dtype.itemsize)
+        keys = np.frombuffer(track.data, dtype=dtype, count=count)
+        frames = keys["frame"].astype(np.int32)
+        if fmt == FORMAT_HERMITE_FLOAT:
+            values = keys["value"].astype(np.float64)
+        else:
+            values = keys["value"] / float(div)
+        if fmt in (FORMAT_HERMITE_16, FORMAT_HERMITE_FLOAT):
+            c0 = keys["c0"].astype(np.float64)
+            c1 = keys["c1"].astype(np.float64)
+        else:
+            c0 = np.zeros(len(keys))
+            c1 = np.zeros(len(keys))
+        return TrackArrays(frames, values, c0, c1)
+
+    keys = track.keys()
+    if fmt == FORMAT_HERMITE_FLOAT:
+        values = [float(k[0]) for k in keys]
+        frames = [int(k[1]) for k in keys]
+    else:
+        values = [k[0] / div for k in keys]
+        frames = [k[1] for k in keys]
+    return TrackArrays(frames, values, [k[2] for k in keys], [k[3] for k in keys])
+
+
+def track_frame_span(track):
+    """(primo, ultimo) frame di un track leggendo solo la prima e l'ultima
+    key (nel file le key sono in ordine di frame); None se non ha key.
+    I frame float di 0x22 vengono arrotondati verso l'esterno (floor/ceil);
+    un frame NaN o infinito solleva MotFormatError."""
+    st = KEY_STRUCTS.get(track.format_type, KEY_STRUCTS[FORMAT_LINEAR_16])
+    data = track.data
+    n = min(track.t_keys, _nbytes(data) // st.size)
+    if n == 0:
+        return None
+    first, last = st.unpack_from(data, 0)[1], st.unpack_from(data, (n - 1) * st.size)[1]
+    if not (math.isfinite(first) and math.isfinite(last)):
+        raise MotFormatError(f"track 0x{track.track_id:03X} at 0x{track.offset or 0:08X}: "
+                             f"non-finite frame ({first}, {last})")
+    return math.floor(first), math.ceil(last)
+
+
+def decode_track_window(track, div=None, frame_window=None):
+    """decode_track limitato alle key con frame in frame_window (start, end
+    inclusi); None se nessuna key cade nella finestra. Un track tutto fuori
+    viene scartato senza decodificarlo."""
+    if frame_window is None:
+        return decode_track(track, div)
+    lo, hi = frame_window
+    span = track_frame_span(track)
+    if span is None or span[1] < lo or span[0] > hi:
+        return None
+    return window_keys(decode_track(track, div), frame_window)
+
+
+def window_keys(keys, frame_window):
+    """TrackArrays con le sole key in frame_window (start, end inclusi),
+    None se non ne resta nessuna."""
+    lo, hi = frame_window
+    frames = keys.frames
+    if np is not None:
+        if np.all(frames[1:] >= frames[:-1]):
+            a, b = np.searchsorted(frames, lo, "left"), np.searchsorted(frames, hi, "right")
+            keys = TrackArrays(*(x[a:b] for x in keys))
+        else:
+            sel = (frames >= lo) & (frames <= hi)
+            keys = TrackArrays(*(x[sel] for x in keys))
+    else:
+        idx = [i for i, f in enumerate(frames) if lo <= f <= hi]
+        keys = TrackArrays(*([x[i] for i in idx] for x in keys))
+    return keys if len(keys.frames) else None
+
+
+# Track decodificato con la sua posizione nel file: section (1-based, come
+# la conta l'importer), node (indice globale NodeN), precisione usata
+DecodedTrack = namedtuple("DecodedTrack", "section node track_id precision keys")
+DecodedMot = namedtuple("DecodedMot", "path loop loop_frame tracks")
+
+
+def iter_decoded_tracks(mot, skip_face=False, nodes=None, frame_window=None):
+    """DecodedTrack uno alla volta, nell'ordine del file, come li legge
+    l'importer (precisione per nodo/canale, sezione FACE saltabile). Solo
+    i track con key e con un id noto; nodes (insieme di indici) e
+    frame_window (start, end) limitano la selezione: i track esclusi non
+    vengono decodificati."""
+    for section_num, section in enumerate(mot.sections, 1):
+        if skip_face and section.section_byte == 0x06:
+            continue
+        for node in section.nodes:
+            if nodes is not None and node.index not in nodes:
+                continue
+            for track in node.tracks:
+                if track.track_id not in TRACK_TYPES or track.t_keys == 0:
+                    continue
+                div = track_precision(node.index, TRACK_TYPES[track.track_id][1])
+                keys = decode_track_window(track, div, frame_window)
+                if keys is not None:
+                    yield DecodedTrack(section_num, node.index, track.track_id, div, keys)
+
+
+def decode_file(filepath, skip_face=False, nodes=None, frame_window=None):
+    """Decodifica tutto un .mot (vedi iter_decoded_tracks). Ritorna solo
+    dati picklable, quindi si può chiamare da un process pool."""
+    if nodes is None and frame_window is None:
+        mot = load(filepath)
+        has_loop, loop_frame = mot.loop
+        return DecodedMot(filepath, has_loop, loop_frame, list(iter_decoded_tracks(mot, skip_face)))
+    # Selezione: file mappato, il payload dei track esclusi non viene letto
+    with mapped_file(filepath) as buf:
+        mot = MotFile.parse(buf)
+        has_loop, loop_frame = mot.loop
+        tracks = list(iter_decoded_tracks(mot, skip_face, nodes, frame_window))
+        del mot
+    return DecodedMot(filepath, has_loop, loop_frame, tracks)
+
+
+def scan_file(filepath, skip_face=False):
+    """(loop, loop_frame, primo frame, ultimo frame, numero di track) senza
+    decodificare: header più la prima e l'ultima key di ogni track, sul
+    file mappato (le pagine con le altre key non vengono lette)."""
+    first, last, n_tracks = None, None, 0
+    with mapped_file(filepath) as buf:
+        mot = MotFile.parse(buf)
+        has_loop, loop_frame = mot.loop
+        for section in mot.sections:
+            if skip_face and section.section_byte == 0x06:
+                continue
+            for node in section.nodes:
+                for track in node.tracks:
+                    if track.track_id not in TRACK_TYPES:
+                        continue
+                    span = track_frame_span(track)
+                    if span is None:
+                        continue
+                    n_tracks += 1
+                    first = span[0] if first is None else min(first, span[0])
+                    last = span[1] if last is None else max(last, span[1])
+        del mot
+    return has_loop, loop_frame, first or 0, last or 0, n_tracks
+
+
+def tangent_handles(frames, values, c0, c1, div, delta_x=1.0):
+    """Handle Blender (sinistra, destra) di tutte le key di un track dalle
+    tangenti del file: c = (delta_y * precision) / delta_x, con
+    delta_x = 1 frame come nell'exporter, quindi delta_y = c * delta_x / div.
+    Il valore della key è arrotondato a float32 come lo salva Blender
+    (keyframe co), così le handle coincidono con quelle calcolate key per
+    key da kf.co. Ritorna due array (N, 2) di coppie (frame, value)."""
+    if np is None:
+        left, right = [], []
+        for x, y, a, b in zip(frames, values, c0, c1):
+            y = struct.unpack("<f", struct.pack("<f", y))[0]
+            left.append((x - delta_x, y - (a * delta_x) / div))
+            right.append((x + delta_x, y + (b * delta_x) / div))
+        return left, right
+    x = np.asarray(frames, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float32).astype(np.float64)
+    left = np.empty((len(x), 2))
+    right = np.empty((len(x), 2))
+    left[:, 0] = x - delta_x
+    left[:, 1] = y - (np.asarray(c0, dtype=np.float64) * delta_x) / div
+    right[:, 0] = x + delta_x
+    right[:, 1] = y + (np.asarray(c1, dtype=np.float64) * delta_x) / div
+    return left, right
+
+
+def _clamp16(v):
+    return max(-32768, min(32767, v))
+
+
+def _tangents_py(co, hl, hr, precision, value_mult):
+    """Tangenti c0 (in) e c1 (out) di una key dalle handle di Blender."""
+    delta_x_left = co[0] - hl[0]
+    if delta_x_left != 0:
+        c0 = ((co[1] - hl[1]) * value_mult * precision) / delta_x_left
+    else:
+        c0 = 0.0
+    delta_x_right = hr[0] - co[0]
+    if delta_x_right != 0:
+        c1 = ((hr[1] - co[1]) * value_mult * precision) / delta_x_right
+    else:
+        c1 = 0.0
+    return _clamp16(int(round(c0))), _clamp16(int(round(c1)))
+
+
+def _quantize16(x):
+    """round() + clamp a int16, come int(round(x)) + max/min dell'exporter."""
+    return np.clip(np.rint(x), -32768, 32767).astype("<i2")
+
+
+def _scaled_keys(co, handle_left, handle_right, precision, value_offset, value_mult):
+    """(frames, valori in unità Blender con offset, valori scalati, c0, c1)
+    di un track, prima della quantizzazione (array float64)."""
+    co = np.asarray(co, dtype=np.float64).reshape(-1, 2)
+    hl = np.asarray(handle_left, dtype=np.float64).reshape(-1, 2)
+    hr = np.asarray(handle_right, dtype=np.float64).reshape(-1, 2)
+    x, y = co[:, 0], co[:, 1]
+
+    frames = np.trunc(x)
+    if len(frames) and (frames.min() < -32768 or frames.max() > 32767):
+        raise ValueError("keyframe frame out of int16 range")
+
+    dx_left = x - hl[:, 0]
+    dx_right = hr[:, 0] - x
+    dy_left = (y - hl[:, 1]) * value_mult * precision
+    dy_right = (hr[:, 1] - y) * value_mult * precision
+    c0 = np.divide(dy_left, dx_left, out=np.zeros_like(dy_left), where=dx_left != 0)
+    c1 = np.divide(dy_right, dx_right, out=np.zeros_like(dy_right), where=dx_right != 0)
+    raw = y + value_offset
+    return frames, raw, raw * value_mult * precision, c0, c1
+
+
+def _pack_keys(track_id, format_type, frames, raw, values, c0, c1):
+    """Track dalle key di _scaled_keys. 0x22 scrive il valore in unità
+    Blender (l'importer non lo divide) e le tangenti scalate non quantizzate;
+    0x11 non ha tangenti."""
+    keys = np.empty(len(frames), dtype=KEY_DTYPES[format_type])
+    if format_type == FORMAT_HERMITE_FLOAT:
+        keys["value"] = raw
+        keys["frame"] = frames
+        keys["c0"] = c0
+        keys["c1"] = c1
+    else:
+        keys["value"] = _quantize16(values)
+        keys["frame"] = frames.astype("<i2")
+        if format_type == FORMAT_HERMITE_16:
+            keys["c0"] = _quantize16(c0)
+            keys["c1"] = _quantize16(c1)
+    return Track(TRACK_ACTIVE | (format_type << 16) | track_id, len(keys), data=keys.tobytes())
+
+
+def encode_track(track_id, co, handle_left, handle_right, precision,
+                 value_offset=0.0, value_mult=1.0, format_type=FORMAT_HERMITE_16):
+    """Codifica un track da tutte le key di una fcurve (di default Hermite
+    16-bit, 0x12).
+
+    co, handle_left, handle_right: coppie (frame, value) per key, come
+    array (N, 2) o flat da foreach_get. value_offset viene sommato al
+    valore (unità Blender) prima di value_mult; value_mult si applica
+    anche alle tangenti (es. -1.0 per le location facciali).
+    Produce gli stessi byte del vecchio loop per-key con struct.pack."""
+    if format_type not in KEY_STRUCTS:
+        raise ValueError(f"unsupported track format 0x{format_type:02X}")
+    if np is None:
+        if format_type != FORMAT_HERMITE_16:
+            raise ValueError(f"track format 0x{format_type:02X} needs numpy")
+        keys = []
+        for c, hl, hr in zip(co, handle_left, handle_right):
+            value_scaled = _clamp16(int(round((c[1] + value_offset) * value_mult * precision)))
+            c0, c1 = _tangents_py(c, hl, hr, precision, value_mult)
+            keys.append((value_scaled, int(c[0]), c0, c1))
+        return Track.from_keys(track_id, format_type, keys)
+    return _pack_keys(track_id, format_type, *_scaled_keys(co, handle_left, handle_right, precision, value_offset, value_mult))
+
+
+# Scelte di encode_track_optimized
+CHOICE_HERMITE = "0x12"
+CHOICE_LINEAR = "0x11"          # tangenti tutte nulle dopo la quantizzazione
+CHOICE_FLOAT = "0x22"           # valori o tangenti fuori da int16
+CHOICE_CONSTANT = "CONSTANT"    # canale costante: 2 key (prima e ultima), 0x11 o 0x22
+
+
+def _out16(a):
+    """Maschera dei valori che dopo round() escono da int16 (tagliati da _quantize16)."""
+    a = np.rint(a)
+    return (a < -32768) | (a > 32767)
+
+
+def _fits16(a):
+    return not _out16(a).any()
+
+
+def encode_track_optimized(track_id, co, handle_left, handle_right, precision,
+                           value_offset=0.0, value_mult=1.0):
+    """Come encode_track, ma col formato più piccolo che l'importer rilegge
+    uguale: 0x11 se tutte le tangenti quantizzate sono 0 (l'importer legge
+    0x11 con c0=c1=0), 0x22 se un valore o una tangente uscirebbe da int16
+    invece di essere tagliata, e un canale costante ridotto a 2 key.
+    Ritorna (Track, scelta)."""
+    frames, raw, values, c0, c1 = _scaled_keys(co, handle_left, handle_right, precision, value_offset, value_mult)
+    if not (_fits16(values) and _fits16(c0) and _fits16(c1)):
+        format_type, choice = FORMAT_HERMITE_FLOAT, CHOICE_FLOAT
+        flat = not c0.any() and not c1.any()
+        constant = flat and np.all(np.float32(raw) == np.float32(raw[0]))
+    else:
+        flat = not np.rint(c0).any() and not np.rint(c1).any()
+        format_type, choice = (FORMAT_LINEAR_16, CHOICE_LINEAR) if flat else (FORMAT_HERMITE_16, CHOICE_HERMITE)
+        constant = flat and np.all(np.rint(values) == np.rint(values[0]))
+    if constant and len(frames) > 2:
+        ends = [0, len(frames) - 1]
+        frames, raw, values, c0, c1 = frames[ends], raw[ends], values[ends], c0[ends], c1[ends]
+        choice = CHOICE_CONSTANT
+    return _pack_keys(track_id, format_type, frames, raw, values, c0, c1), choice
+
+
+class Track:
+    """Single channel track: header fields plus key data (buffer slice
+    or compact array)."""
+
+    __slots__ = ("t_type", "t_keys", "t_size", "track_id", "format_type", "precision",
+                 "offset", "extra", "_data", "_source")
+
+    def __init__(self, t_type, t_keys, t_size=None, data=b"", extra=b"", precision=None, offset=None):
+        self.t_type = t_type
+        self.t_keys = t_keys
+        self.track_id = t_type & 0xFFF
+        self.format_type = (t_type >> 16) & 0xFF
+        self.precision = precision
+        self.offset = offset
+        self._data = data
+        self._source = None
+        self.extra = extra
+        self.t_size = TRACK_HEADER.size + _nbytes(data) + len(extra) if t_size is None else t_size
+
+    @property
+    def data(self):
+        """Key data; in lazy mode letta dal file al primo accesso."""
+        if self._data is None:
+            start = self.offset + TRACK_HEADER.size
+            end = min(start + self.t_keys * self.key_size, len(self._source))
+            self._data = self._source.load()[start:end]
+            self._source = None
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._source = None
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    @property
+    def key_size(self):
+        return key_size(self.format_type)
+
+    @classmethod
+    def from_keys(cls, track_id, format_type, keys):
+        """Build a track from (value, frame, c0, c1) tuples (0x11: (value, frame))."""
+        st = KEY_STRUCTS[format_type]
+        data = b"".join(st.pack(*k) for k in keys)
+        return cls(TRACK_ACTIVE | (format_type << 16) | track_id, len(keys), data=data)
+
+    @classmethod
+    def parse(cls, buf, offset, precision=None, compact=False):
+        t_type, t_keys, t_size = _unpack(TRACK_HEADER, buf, offset)
+        format_type = (t_type >> 16) & 0xFF
+        start = offset + TRACK_HEADER.size
+        data_end = min(start + t_keys * key_size(format_type), len(buf))
+        track_end = min(offset + t_size, len(buf))
+        extra = buf[data_end:track_end] if track_end > data_end else b""
+        if isinstance(buf, _LazySource):
+            track = cls(t_type, t_keys, t_size, b"", extra, precision, offset)
+            track._data = None
+            track._source = buf
+            return track
+        data = buf[start:data_end]
+        if compact:
+            data = _compact(data, format_type)
+            extra = bytes(extra)
+        return cls(t_type, t_keys, t_size, data, extra, precision, offset)
+
+    def keys(self):
+        """Raw keys as (value, frame, c0, c1); 0x11 tracks have c0 = c1 = 0."""
+        st = KEY_STRUCTS.get(self.format_type, KEY_STRUCTS[FORMAT_LINEAR_16])
+        data = memoryview(self.data).cast("B")
+        n = min(self.t_keys, len(data) // st.size)
+        data = data[:n * st.size]  # key troncata a fine file: scartata
+        if st.size == 4:
+            return [(v, fr, 0, 0) for v, fr in st.iter_unpack(data)]
+        return list(st.iter_unpack(data))
+
+    def serialize(self):
+        return TRACK_HEADER.pack(self.t_type, self.t_keys, self.t_size) + bytes(self.data) + bytes(self.extra)
+
+
+class Node:
+    """Node (bone/object) block holding its tracks."""
+
+    __slots__ = ("n_type", "n_sub", "n_size", "tracks", "extra", "index")
+
+    def __init__(self, n_type, n_sub=0, n_size=None, tracks=None, extra=b"", index=None):
+        self.n_type = n_type
+        self.tracks = tracks if tracks is not None else []
+        self.n_sub = n_sub
+        self.extra = extra
+        self.index = index
+        if n_size is None:
+            n_size = NODE_HEADER.size + sum(t.t_size for t in self.tracks) + len(extra)
+        self.n_size = n_size
+
+    @property
+    def active(self):
+        return self.n_type >= NODE_ACTIVE
+
+    @property
+    def name(self):
+        return f"Node{self.index}"
+
+    @property
+    def byte_size(self):
+        """Bytes this node advances the section walk by."""
+        return self.n_size if self.active else INVALID_NODE.size
+
+    @classmethod
+    def from_tracks(cls, tracks, index=None):
+        n_type = NODE_ACTIVE
+        for t in tracks:
+            n_type |= t.track_id
+        return cls(n_type, len(tracks), tracks=list(tracks), index=index)
+
+    @classmethod
+    def empty(cls, index=None):
+        return cls(NODE_ACTIVE, 0, NODE_HEADER.size, index=index)
+
+    @classmethod
+    def parse(cls, buf, offset, index=None, compact=False):
+        n_type, n_sub, n_size = _unpack(NODE_HEADER, buf, offset)
+        if n_type < NODE_ACTIVE:
+            # Nodo non valido: l'importer avanza di soli 4 byte
+            return cls(n_type, n_sub, n_size, index=index)
+        tracks = []
+        track_ptr = offset + NODE_HEADER.size
+        for _ in range(n_sub):
+            t_type = _unpack(INVALID_NODE, buf, track_ptr)[0]
+            precision = None
+            if index is not None and (t_type & 0xFFF) in TRACK_TYPES:
+                precision = track_precision(index, TRACK_TYPES[t_type & 0xFFF][1])
+            track = Track.parse(buf, track_ptr, precision, compact)
+            tracks.append(track)
+            track_ptr += track.t_size
+        node_end = min(offset + n_size, len(buf))
+        extra = buf[track_ptr:node_end] if node_end > track_ptr else b""
+        if compact:
+            extra = bytes(extra)
+        return cls(n_type, n_sub, n_size, tracks, extra, index)
+
+    def serialize(self):
+        if not self.active:
+            return INVALID_NODE.pack(self.n_type)
+        out = bytearray(NODE_HEADER.pack(self.n_type, self.n_sub, self.n_size))
+        for t in self.tracks:
+            out += t.serialize()
+        out += self.extra
+        return bytes(out)
+
+
+class Section:
+    """Section block (LOWER 0x0A, UPPER 0x0C, FACE 0x06, HANDS 0x04, ...)."""
+
+    __slots__ = ("h_type", "h_count", "h_size", "h_loop", "h_loopFrame", "nodes", "extra",
+                 "offset", "first_node", "name")
+
+    def __init__(self, h_type, h_count, h_size=None, h_loop=0, h_loopFrame=0.0,
+                 nodes=None, extra=b"", offset=0, first_node=0, name="UNKNOWN"):
+        self.h_type = h_type
+        self.h_count = h_count
+        self.h_loop = h_loop
+        self.h_loopFrame = h_loopFrame
+        self.nodes = nodes if nodes is not None else []
+        self.extra = extra
+        self.offset = offset
+        self.first_node = first_node
+        self.name = name
+        if h_size is None:
+            h_size = SECTION_HEADER.size + sum(n.byte_size for n in self.nodes) + len(extra)
+        self.h_size = h_size
+
+    @property
+    def section_byte(self):
+        return self.h_count & 0xFF
+
+    @classmethod
+    def from_nodes(cls, h_count, nodes, loop=False, loop_frame=0.0):
+        h_loop = 1 if loop else 0
+        h_loopFrame = float(loop_frame) if loop else 0.0
+        first = nodes[0].index if nodes and nodes[0].index is not None else 0
+        name = SECTION_LAYOUT.get(h_count & 0xFF, ("UNKNOWN", 0))[0]
+        return cls(SECTION_TYPE, h_count, None, h_loop, h_loopFrame, list(nodes), first_node=first, name=name)
+
+    @classmethod
+    def parse(cls, buf, offset, first_node=0, name="UNKNOWN", compact=False):
+        h_type, h_count, h_size, h_loop, h_loopFrame = _unpack(SECTION_HEADER, buf, offset)
+        section_end = min(offset + h_size, len(buf))
+        nodes = []
+        node_ptr = offset + SECTION_HEADER.size
+        node_idx = first_node
+        for _ in range(h_count):
+            if node_ptr + NODE_HEADER.size > section_end:
+                break
+            node = Node.parse(buf, node_ptr, node_idx, compact)
+            nodes.append(node)
+            node_ptr += node.byte_size
+            node_idx += 1
+        extra = buf[node_ptr:section_end] if section_end > node_ptr else b""
+        if compact:
+            extra = bytes(extra)
+        return cls(h_type, h_count, h_size, h_loop, h_loopFrame, nodes, extra, offset, first_node, name)
+
+    def serialize(self):
+        out = bytearray(SECTION_HEADER.pack(self.h_type, self.h_count, self.h_size, self.h_loop, self.h_loopFrame))
+        for n in self.nodes:
+            out += n.serialize()
+        out += self.extra
+        return bytes(out)
+
+
+class MotFile:
+    """Whole .mot file: sections in file order plus any trailing bytes."""
+
+    __slots__ = ("sections", "trailing")
+
+    def __init__(self, sections=None, trailing=b""):
+        self.sections = sections if sections is not None else []
+        self.trailing = trailing
+
+    @property
+    def loop(self):
+        """(has_loop, loop_frame) come letto dall'importer (ultima sezione con loop=1)."""
+        has_loop, loop_frame = False, 0
+        for s in self.sections:
+            if s.h_loop == 1:
+                has_loop, loop_frame = True, int(s.h_loopFrame)
+        return has_loop, loop_frame
+
+    def nodes(self):
+        for s in self.sections:
+            yield from s.nodes
+
+    @classmethod
+    def parse(cls, data, compact=False):
+        if isinstance(data, _LazySource):
+            buf = data
+        else:
+            buf = memoryview(data)
+            if buf.ndim != 1 or buf.itemsize != 1:
+                buf = buf.cast("B")
+        file_size = len(buf)
+        sections = []
+        offset = 0
+        node_idx = 0
+        hands_count = 0
+        while offset + SECTION_HEADER.size <= file_size:
+            h_count, h_size = _unpack(SECTION_HEADER, buf, offset)[1:3]
+            if h_size == 0 or h_size > file_size:
+                break
+            section_byte = h_count & 0xFF
+            name = "UNKNOWN"
+            if section_byte in SECTION_LAYOUT:
+                name, node_idx = SECTION_LAYOUT[section_byte]
+            elif section_byte == HANDS_SECTION:
+                # Ulteriori sezioni 0x04 continuano da dove si è fermato
+                if hands_count < len(HANDS_FIRST_NODES):
+                    node_idx = HANDS_FIRST_NODES[hands_count]
+                    name = ("HANDS_L", "HANDS_R")[hands_count]
+                else:
+                    name = f"HANDS_{hands_count}"
+                hands_count += 1
+            section = Section.parse(buf, offset, node_idx, name, compact)
+            sections.append(section)
+            node_idx += len(section.nodes)
+            offset += h_size
+        trailing = buf[offset:file_size] if offset < file_size else b""
+        if compact:
+            trailing = bytes(trailing)
+        return cls(sections, trailing)
+
+    def serialize(self):
+        out = bytearray()
+        for s in self.sections:
+            out += s.serialize()
+        out += self.trailing
+        return bytes(out)
+
+
+@contextmanager
+def mapped_file(filepath):
+    """memoryview del file mappato in memoria (mmap): dal disco vengono
+    lette solo le pagine toccate, quindi un track saltato tramite gli
+    offset degli header non viene letto."""
+    with open(filepath, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    buf = memoryview(mm)
+    try:
+        yield buf
+    finally:
+        try:
+            buf.release()
+            mm.close()
+        except BufferError:
+            pass  # slice ancora in uso: l'mmap si chiude quando non è più referenziato
+
+
+def load(filepath, compact=True, lazy=False):
+    """Read and parse a .mot file (compact: key data in owned arrays,
+    the file buffer is not kept alive; lazy: headers only, key data
+    read on first access)."""
+    if lazy:
+        source = _LazySource(filepath)
+        try:
+            return MotFile.parse(source)
+        finally:
+            source.close()
+    with open(filepath, "rb") as f:
+        return MotFile.parse(f.read(), compact)
+
+
+# Un track da scrivere (exporter): keyframes = (co, handle_left, handle_right)
+# come array (N, 2), oppure None per un track di default (2 key piatte su
+# frame_start/frame_end). Solo dati semplici: si può passare a un altro processo.
+# optimize=True sceglie il formato con encode_track_optimized.
+TrackSpec = namedtuple("TrackSpec", "track_id format_type keyframes precision frame_start frame_end value_offset value_mult optimize",
+                       defaults=(False,))
+
+# Una riga del report di build_nodes: key e byte del track prima (come 0x12,
+# una key per keyframe) e dopo la scelta del formato, più gli errori di
+# quantization_error (unità Blender; slope_error = pendenza per frame)
+TrackReport = namedtuple("TrackReport", "node track_id choice keys_in keys_out size_in size_out "
+                                        "max_error sq_error slope_error clamped_values clamped_tangents clamped_frames")
+
+
+def build_track(spec):
+    """(Track, scelta) da un TrackSpec (None se keyframes non ha key).
+    value_offset viene aggiunto al valore (in unità Blender) PRIMA del
+    value_mult - usato per ripristinare l'offset visivo di Node2.LOC_Y
+    nei modelli HD. value_mult moltiplica il valore (offset incluso)
+    prima della conversione - usato per invertire il segno delle location
+    facciali (Node23-27), coerente con mult=-1.0/div negativo nell'importer."""
+    if spec.keyframes is None and spec.optimize:
+        # track di default = 2 key piatte, come keyframe con handle sulla key
+        co = np.array([(spec.frame_start, 0.0), (spec.frame_end, 0.0)])
+        return encode_track_optimized(spec.track_id, co, co, co, spec.precision, spec.value_offset, spec.value_mult)
+    if spec.keyframes is None:
+        offset_scaled = _clamp16(int(round(spec.value_offset * spec.value_mult * spec.precision)))
+        keys = [(offset_scaled, spec.frame_start, 0, 0), (offset_scaled, spec.frame_end, 0, 0)]
+        return Track.from_keys(spec.track_id, spec.format_type, keys), CHOICE_HERMITE
+    co, handle_left, handle_right = spec.keyframes
+    if len(co) == 0:
+        return None
+    if spec.optimize:
+        return encode_track_optimized(spec.track_id, co, handle_left, handle_right, spec.precision,
+                                      spec.value_offset, spec.value_mult)
+    return encode_track(spec.track_id, co, handle_left, handle_right, spec.precision,
+                        value_offset=spec.value_offset, value_mult=spec.value_mult,
+                        format_type=spec.format_type), CHOICE_HERMITE
+
+
+def quantization_error(spec, track):
+    """Rilegge il track codificato con la matematica dell'importer
+    (decode_track con div = precision * value_mult, poi value_offset tolto)
+    e lo confronta con le key di Blender del TrackSpec, tutto vettoriale.
+    Ritorna (errore massimo, somma dei quadrati degli errori, errore massimo
+    sulla pendenza delle tangenti, valori tagliati a int16, tangenti
+    tagliate, frame delle key tagliate)."""
+    if np is None:
+        return 0.0, 0.0, 0.0, 0, 0, ()
+    if spec.keyframes is None:
+        co = np.array([(spec.frame_start, 0.0), (spec.frame_end, 0.0)])
+        keyframes = (co, co, co)
+    else:
+        keyframes = spec.keyframes
+    frames, raw, values, c0, c1 = _scaled_keys(*keyframes, spec.precision, spec.value_offset, spec.value_mult)
+    x = np.asarray(keyframes[0], dtype=np.float64).reshape(-1, 2)[:, 0]
+    y = raw - spec.value_offset
+    div = spec.precision * spec.value_mult
+    decoded = decode_track(track, div)
+    got_frames = np.asarray(decoded.frames, dtype=np.float64)
+    got = np.interp(x, got_frames, np.asarray(decoded.values) - spec.value_offset) if len(got_frames) else np.zeros_like(y)
+    err = np.abs(got - y)
+
+    # pendenze per frame: handle di Blender contro c0/c1 riletti (0x11 e le
+    # tracce costanti ridotte a 2 key rileggono tangenti nulle)
+    scale = spec.precision * spec.value_mult
+    if len(decoded.c0) == len(c0):
+        slope_err = np.maximum(np.abs(np.asarray(decoded.c0) / div - c0 / scale),
+                               np.abs(np.asarray(decoded.c1) / div - c1 / scale))
+    else:
+        slope_err = np.maximum(np.abs(c0), np.abs(c1)) / abs(scale)
+
+    clamped_values = np.zeros(len(x), dtype=bool)
+    clamped_tangents = np.zeros(len(x), dtype=bool)
+    if track.format_type != FORMAT_HERMITE_FLOAT:
+        clamped_values = _out16(values)
+        if track.format_type == FORMAT_HERMITE_16:
+            clamped_tangents = _out16(c0) | _out16(c1)
+    clamped_frames = tuple(int(f) for f in frames[clamped_values | clamped_tangents])
+    return (float(err.max(initial=0.0)), float(np.square(err).sum()), float(slope_err.max(initial=0.0)),
+            int(clamped_values.sum()), int(clamped_tangents.sum()), clamped_frames)
+
+
+def build_nodes(node_specs, report=None):
+    """Nodi di una sezione da [(node_idx, [TrackSpec])]: un nodo senza
+    track viene scritto vuoto. Con report (lista) aggiunge un TrackReport
+    per ogni track scritto, con l'analisi di quantization_error."""
+    nodes = []
+    for node_idx, specs in node_specs:
+        tracks = []
+        for spec in specs:
+            built = build_track(spec)
+            if built is None:
+                continue
+            track, choice = built
+            tracks.append(track)
+            if report is not None:
+                keys_in = 2 if spec.keyframes is None else len(spec.keyframes[0])
+                size_in = TRACK_HEADER.size + keys_in * key_size(FORMAT_HERMITE_16)
+                report.append(TrackReport(node_idx, spec.track_id, choice, keys_in, track.t_keys, size_in, track.t_size,
+                                          *quantization_error(spec, track)))
+        nodes.append(Node.from_tracks(tracks, node_idx) if tracks else Node.empty(node_idx))
+    return nodes
+
+
+def section_fingerprint(h_count, node_specs):
+    """Hash di tutto ciò da cui dipendono i byte dei nodi di una sezione:
+    array di key e handle, frame range, precisione, offset e segno di ogni
+    track. Il loop non c'entra, sta nell'header della sezione."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(repr(h_count).encode())
+    for node_idx, specs in node_specs:
+        h.update(repr((node_idx, len(specs))).encode())
+        for spec in specs:
+            h.update(repr(spec._replace(keyframes=spec.keyframes is None)).encode())
+            for a in spec.keyframes or ():
+                if np is None:
+                    h.update(repr([tuple(p) for p in a]).encode())
+                else:
+                    a = np.ascontiguousarray(a)
+                    h.update(repr((a.dtype.str, a.shape)).encode())
+                    h.update(a.tobytes())
+    return h.hexdigest()
+
+
+def build_mot(sections, loop=False, loop_frame=0, report=None):
+    """MotFile da [(h_count, [(node_idx, [TrackSpec])])]."""
+    mot = MotFile()
+    for h_count, node_specs in sections:
+        mot.sections.append(Section.from_nodes(h_count, build_nodes(node_specs, report), loop, loop_frame))
+    return mot
+
+
+def encode_mot(sections, loop=False, loop_frame=0, with_report=True):
+    """(byte del file, [TrackReport]) di build_mot(): la funzione eseguita
+    nei worker del batch export. with_report=False salta i TrackReport
+    (e quantization_error): il report resta vuoto."""
+    report = [] if with_report else None
+    return build_mot(sections, loop, loop_frame, report).serialize(), report or []
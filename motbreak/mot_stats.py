@@ -0,0 +1,122 @@
+"""
+Per-phase timing and counters for the importer and exporter (no bpy).
+
+A RunStats collects wall time per phase (with stats.phase("decode"): ...)
+and counters (nodes, tracks, keys, bytes). The per-node/per-track log
+goes through stats.log(), which prints only with verbosity FULL: on the
+Windows system console printing is a measurable part of the runtime.
+
+At the end finish() prints one summary block (unless QUIET), optionally
+writes the same data as JSON and, if profiling was enabled, the cProfile
+stats (dumped to a .prof file next to the JSON, or the top functions
+printed in the summary).
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+from contextlib import contextmanager
+
+QUIET = "QUIET"
+SUMMARY = "SUMMARY"
+FULL = "FULL"
+
+# items per EnumProperty
+VERBOSITY_ITEMS = [
+    (QUIET, "Quiet", "No console output except errors"),
+    (SUMMARY, "Summary", "Only the timing/counter summary at the end"),
+    (FULL, "Full", "Log every section, node and track (slow on the Windows console)"),
+]
+
+PROFILE_TOP = 25
+
+
+class RunStats:
+    def __init__(self, title, verbosity=FULL, profile=False):
+        self.title = title
+        self.verbosity = verbosity
+        self.phases = {}    # nome -> secondi, nell'ordine in cui compaiono
+        self.counters = {}
+        self._profiler = cProfile.Profile() if profile else None
+        self._start = time.perf_counter()
+
+    def log(self, *args, **kwargs):
+        if self.verbosity == FULL:
+            print(*args, **kwargs)
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - t0
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def profiling(self):
+        """cProfile attivo solo dentro il blocco (es. un tick di un operatore modal)."""
+        if self._profiler is None:
+            yield
+            return
+        self._profiler.enable()
+        try:
+            yield
+        finally:
+            self._profiler.disable()
+
+    def as_dict(self):
+        total = time.perf_counter() - self._start
+        return {
+            "title": self.title,
+            "total_s": total,
+            "phases_s": dict(self.phases),
+            "other_s": max(0.0, total - sum(self.phases.values())),
+            "counters": dict(self.counters),
+        }
+
+    def finish(self, json_path=None):
+        """Stampa il riepilogo (se non QUIET), scrive il JSON se richiesto.
+        Ritorna il dict del riepilogo."""
+        data = self.as_dict()
+        profile_text = None
+        if self._profiler is not None:
+            if json_path:
+                data["profile"] = os.path.splitext(json_path)[0] + ".prof"
+                try:
+                    self._profiler.dump_stats(data["profile"])
+                except OSError as e:
+                    print(f"STATS: could not write {data['profile']}: {e}")
+            else:
+                out = io.StringIO()
+                pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+                profile_text = out.getvalue()
+        if json_path:
+            try:
+                with open(json_path, "w") as f:
+                    json.dump(data, f, indent=1)
+            except OSError as e:
+                print(f"STATS: could not write {json_path}: {e}")
+        if self.verbosity != QUIET:
+            print(self.summary(data))
+            if profile_text:
+                print(profile_text)
+        return data
+
+    def summary(self, data=None):
+        data = data or self.as_dict()
+        total = data["total_s"]
+        lines = ["", "=" * 60, f"{self.title} SUMMARY: {total * 1000:.1f} ms", "=" * 60]
+        for name, seconds in list(data["phases_s"].items()) + [("other", data["other_s"])]:
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"  {name:<12} {seconds * 1000:10.1f} ms  {share:5.1f}%")
+        if data["counters"]:
+            lines.append("  " + ", ".join(f"{k}={v}" for k, v in data["counters"].items()))
+        if "profile" in data:
+            lines.append(f"  cProfile: {data['profile']}")
+        lines.append("=" * 60)
+        return "\n".join(lines)
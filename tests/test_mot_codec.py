@@ -0,0 +1,257 @@
+"""
+mot_codec on synthetic .mot bytes (no bpy).
+
+  - encode_track against the exporter's old per-key struct.pack writer,
+    and encode -> MotFile.parse -> serialize byte-identical
+  - compact (array-backed) parse and lazy load decode like the eager parse
+  - decoding of truncated and unknown tracks, frame span of float frames
+
+Run: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import array
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motbreak import mot_codec
+
+
+def random_keys(format_type, n_keys, rnd, first_frame=0):
+    keys = []
+    for frame in range(first_frame, first_frame + n_keys * 2, 2):
+        if format_type == mot_codec.FORMAT_HERMITE_FLOAT:
+            keys.append((rnd.uniform(-50.0, 50.0), float(frame), rnd.uniform(-900.0, 900.0), rnd.uniform(-900.0, 900.0)))
+        elif format_type == mot_codec.FORMAT_HERMITE_16:
+            keys.append((rnd.randint(-32768, 32767), frame, rnd.randint(-32768, 32767), rnd.randint(-32768, 32767)))
+        else:
+            keys.append((rnd.randint(-32768, 32767), frame))
+    return keys
+
+
+def synthetic_mot(seed=0, loop=True):
+    """MotFile con LOWER (0x0A), FACE (0x06) e HANDS_L (0x04): tutti e tre i
+    formati di key, un nodo vuoto e un nodo non valido (4 byte)."""
+    rnd = random.Random(seed)
+    formats = (mot_codec.FORMAT_LINEAR_16, mot_codec.FORMAT_HERMITE_16, mot_codec.FORMAT_HERMITE_FLOAT)
+    sections = []
+    for h_count, first, n_nodes in ((0x0A, 0, 10), (0x06, 22, 6), (0x04, 28, 4)):
+        nodes = []
+        for i in range(n_nodes):
+            idx = first + i
+            if idx == 4:
+                nodes.append(mot_codec.Node.empty(idx))
+                continue
+            if idx == 6:
+                nodes.append(mot_codec.Node(0x00000001, index=idx))
+                continue
+            tracks = [mot_codec.Track.from_keys(track_id, formats[(idx + n) % 3],
+                                                random_keys(formats[(idx + n) % 3], rnd.randint(1, 12), rnd))
+                      for n, track_id in enumerate((0x008, 0x010, 0x020, 0x040, 0x080, 0x100))]
+            nodes.append(mot_codec.Node.from_tracks(tracks, idx))
+        sections.append(mot_codec.Section.from_nodes(h_count, nodes, loop, 12))
+    return mot_codec.MotFile(sections)
+
+
+def old_writer(track_id, keyframes, precision, value_offset=0.0, value_mult=1.0):
+    """Loop per-key dell'exporter prima di encode_track (0x12, struct.pack)."""
+    def tangents(co, hl, hr):
+        dx = co[0] - hl[0]
+        c0 = ((co[1] - hl[1]) * value_mult * precision) / dx if dx != 0 else 0.0
+        dx = hr[0] - co[0]
+        c1 = ((hr[1] - co[1]) * value_mult * precision) / dx if dx != 0 else 0.0
+        return max(-32768, min(32767, int(round(c0)))), max(-32768, min(32767, int(round(c1))))
+
+    data = b""
+    for co, hl, hr in zip(*keyframes):
+        value_scaled = int(round((co[1] + value_offset) * value_mult * precision))
+        value_scaled = max(-32768, min(32767, value_scaled))
+        data += struct.pack("<hhhh", value_scaled, int(co[0]), *tangents(co, hl, hr))
+    return struct.pack("<III", mot_codec.TRACK_ACTIVE | (mot_codec.FORMAT_HERMITE_16 << 16) | track_id,
+                       len(keyframes[0]), 12 + len(data)) + data
+
+
+def random_keyframes(n_keys, rnd, amplitude):
+    """(co, handle_left, handle_right) come da foreach_get: include handle a
+    larghezza zero e valori/tangenti che escono da int16."""
+    co, hl, hr = [], [], []
+    frame = float(rnd.randint(-20, 5))
+    for _ in range(n_keys):
+        frame += rnd.choice((1.0, 2.0, 3.5))
+        value = rnd.uniform(-amplitude, amplitude)
+        wl = rnd.choice((0.0, 0.5, 1.0, 1.7))
+        wr = rnd.choice((0.0, 0.5, 1.0, 2.3))
+        co.append((frame, value))
+        hl.append((frame - wl, value + rnd.uniform(-amplitude, amplitude)))
+        hr.append((frame + wr, value + rnd.uniform(-amplitude, amplitude)))
+    return co, hl, hr
+
+
+def decoded(mot, **kwargs):
+    return [(dt.section, dt.node, dt.track_id, dt.precision, [tuple(map(float, k)) for k in dt.keys.rows()])
+            for dt in mot_codec.iter_decoded_tracks(mot, **kwargs)]
+
+
+class EncodeTest(unittest.TestCase):
+    CASES = [  # (track_id, precision, value_offset, value_mult, ampiezza)
+        (0x008, 2607.59, 0.0, 1.0, 3.0),
+        (0x040, 16.0, 0.0, 1.0, 2500.0),      # fuori da int16: valori tagliati
+        (0x080, 16.0, 0.35, 1.0, 40.0),       # offset di Node2.LOC_Y
+        (0x040, 256.0, 0.0, -1.0, 0.5),       # location facciale
+        (0x001, 16.0, 0.0, 1.0, 1.5),
+    ]
+
+    def check_old_writer(self):
+        for n, (track_id, precision, offset, mult, amplitude) in enumerate(self.CASES):
+            keyframes = random_keyframes(60, random.Random(n), amplitude)
+            with self.subTest(track_id=hex(track_id), precision=precision):
+                track = mot_codec.encode_track(track_id, *keyframes, precision, offset, mult)
+                self.assertEqual(track.serialize(), old_writer(track_id, keyframes, precision, offset, mult))
+
+    @unittest.skipIf(mot_codec.np is None, "numpy not installed")
+    def test_old_writer_numpy(self):
+        self.check_old_writer()
+
+    def test_old_writer_pure_python(self):
+        np = mot_codec.np
+        mot_codec.np = None
+        try:
+            self.check_old_writer()
+        finally:
+            mot_codec.np = np
+
+    def test_parse_serialize_roundtrip(self):
+        data = synthetic_mot().serialize()
+        self.assertEqual(mot_codec.MotFile.parse(data).serialize(), data)
+
+    @unittest.skipIf(mot_codec.np is None, "numpy not installed")
+    def test_build_mot_roundtrip(self):
+        rnd = random.Random(7)
+        sections = []
+        for h_count, first, n_nodes in ((0x0A, 0, 10), (0x06, 22, 6)):
+            node_specs = []
+            for idx in range(first, first + n_nodes):
+                specs = [mot_codec.TrackSpec(track_id, mot_codec.FORMAT_HERMITE_16,
+                                             random_keyframes(rnd.randint(1, 20), rnd, 2.0) if idx % 3 else None,
+                                             mot_codec.track_precision(idx, mot_codec.TRACK_TYPES[track_id][1]),
+                                             0, 30, 0.0, 1.0, optimize=bool(idx % 2))
+                         for track_id in (0x008, 0x010, 0x020, 0x040)]
+                node_specs.append((idx, specs if idx != 4 else []))
+            sections.append((h_count, node_specs))
+        data, report = mot_codec.encode_mot(sections, loop=True, loop_frame=30)
+        mot = mot_codec.MotFile.parse(data)
+        self.assertEqual(mot.serialize(), data)
+        self.assertEqual(mot.loop, (True, 30))
+        self.assertEqual(len(report), sum(len(specs) for _, node_specs in sections for _, specs in node_specs))
+        self.assertEqual(mot_codec.encode_mot(sections, True, 30, with_report=False), (data, []))
+
+
+class LoadModesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.data = synthetic_mot(seed=3).serialize()
+        # seconda variante: ultimo track troncato a metà key
+        last = mot_codec.MotFile.parse(self.data).sections[-1].nodes[-1].tracks[-1]
+        self.files = {"full": self.data, "truncated": self.data[:last.offset + mot_codec.TRACK_HEADER.size + 3]}
+
+    def write(self, name):
+        path = os.path.join(self.tmp, name + ".mot")
+        with open(path, "wb") as f:
+            f.write(self.files[name])
+        return path
+
+    def check_mode(self, **kwargs):
+        for name, data in self.files.items():
+            with self.subTest(file=name, **kwargs):
+                eager = mot_codec.MotFile.parse(data)
+                mot = mot_codec.load(self.write(name), **kwargs)
+                self.assertEqual(decoded(mot), decoded(eager))
+                self.assertEqual(decoded(mot, skip_face=True, nodes={1, 3, 29}, frame_window=(4, 10)),
+                                 decoded(eager, skip_face=True, nodes={1, 3, 29}, frame_window=(4, 10)))
+                self.assertEqual(mot.serialize(), data)
+
+    def test_compact(self):
+        self.check_mode(compact=True)
+        mot = mot_codec.MotFile.parse(self.data, compact=True)
+        for node in mot.nodes():
+            for track in node.tracks:
+                self.assertIsInstance(track.data, array.array)  # copia owned, non uno slice del file
+
+    def test_compact_pure_python(self):
+        np = mot_codec.np
+        mot_codec.np = None
+        try:
+            self.check_mode(compact=True)
+        finally:
+            mot_codec.np = np
+
+
+    def test_lazy(self):
+        self.check_mode(lazy=True)
+
+    def test_lazy_reads_keys_on_demand(self):
+        mot = mot_codec.load(self.write("full"), lazy=True)
+        tracks = [t for node in mot.nodes() for t in node.tracks]
+        self.assertFalse(any(t.loaded for t in tracks))
+        eager = mot_codec.MotFile.parse(self.data)
+        self.assertEqual(tracks[5].keys(), eager.sections[0].nodes[0].tracks[5].keys())
+        self.assertEqual(sum(t.loaded for t in tracks), 1)
+
+
+class DecodeTrackTest(unittest.TestCase):
+    def test_truncated_last_track(self):
+        data = synthetic_mot().serialize()
+        full = mot_codec.MotFile.parse(data)
+        last = full.sections[-1].nodes[-1].tracks[-1]
+        # taglio a metà dell'ultima key dell'ultimo track
+        cut = data[:last.offset + mot_codec.TRACK_HEADER.size + (last.t_keys - 1) * last.key_size + 2]
+        expected = decoded(full)
+        expected[-1] = expected[-1][:4] + (expected[-1][4][:-1],)
+        if not expected[-1][4]:
+            expected.pop()
+        for np in (mot_codec.np, None):
+            with self.subTest(numpy=np is not None):
+                saved, mot_codec.np = mot_codec.np, np
+                try:
+                    self.assertEqual(decoded(mot_codec.MotFile.parse(cut)), expected)
+                finally:
+                    mot_codec.np = saved
+
+    def test_unknown_track_id_is_unscaled(self):
+        track = mot_codec.Track.from_keys(0x200, mot_codec.FORMAT_LINEAR_16, [(320, 0), (-16, 5)])
+        node = mot_codec.Node.parse(mot_codec.Node.from_tracks([track], 3).serialize(), 0, index=3)
+        self.assertIsNone(node.tracks[0].precision)
+        keys = mot_codec.decode_track(node.tracks[0])
+        self.assertEqual(list(map(float, keys.values)), [320.0, -16.0])
+
+    def test_frame_span_float_frames(self):
+        track = mot_codec.Track.from_keys(0x008, mot_codec.FORMAT_HERMITE_FLOAT,
+                                          [(0.0, -1.5, 0.0, 0.0), (1.0, 3.0, 0.0, 0.0), (2.0, 7.25, 0.0, 0.0)])
+        self.assertEqual(mot_codec.track_frame_span(track), (-2, 8))
+        for bad in (float("nan"), float("inf")):
+            track = mot_codec.Track.from_keys(0x008, mot_codec.FORMAT_HERMITE_FLOAT,
+                                              [(0.0, 0.0, 0.0, 0.0), (1.0, bad, 0.0, 0.0)])
+            with self.subTest(frame=bad), self.assertRaises(mot_codec.MotFormatError):
+                mot_codec.track_frame_span(track)
+
+    def test_scan_file_non_finite_frame(self):
+        node = mot_codec.Node.from_tracks([mot_codec.Track.from_keys(
+            0x008, mot_codec.FORMAT_HERMITE_FLOAT, [(0.0, 0.5, 0.0, 0.0), (1.0, float("nan"), 0.0, 0.0)])], 0)
+        nodes = [node] + [mot_codec.Node.empty(i) for i in range(1, 10)]
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, "nan.mot")
+        with open(path, "wb") as f:
+            f.write(mot_codec.MotFile([mot_codec.Section.from_nodes(0x0A, nodes)]).serialize())
+        with self.assertRaises(mot_codec.MotFormatError):
+            mot_codec.scan_file(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+mot_npz round-trip on synthetic .mot bytes (no bpy, needs numpy): the
+.mot rebuilt from the arrays is byte-identical, fractional and NaN 0x22
+frames included.
+
+Run: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from motbreak import mot_codec
+from test_mot_codec import synthetic_mot
+
+try:
+    import mot_npz
+except ImportError:  # numpy non installato
+    mot_npz = None
+
+
+def float_frame_mot():
+    """Node0 con due tracce 0x22 a frame frazionari, NaN e inf più una 0x12."""
+    nan = struct.unpack("<f", struct.pack("<I", 0x7FC00001))[0]  # NaN con payload
+    tracks = [
+        mot_codec.Track.from_keys(0x008, mot_codec.FORMAT_HERMITE_FLOAT,
+                                  [(0.25, 0.0, 1.0, -1.0), (0.5, 2.5, 0.0, 0.0), (-1.0, 7.75, 3.0, 2.0)]),
+        mot_codec.Track.from_keys(0x010, mot_codec.FORMAT_HERMITE_FLOAT,
+                                  [(1.0, -0.5, 0.0, 0.0), (2.0, nan, 0.0, 0.0), (3.0, float("inf"), 0.0, 0.0)]),
+        mot_codec.Track.from_keys(0x020, mot_codec.FORMAT_HERMITE_16, [(100, 0, 5, -5), (-200, 9, 0, 0)]),
+    ]
+    node = mot_codec.Node.from_tracks(tracks, 0)
+    nodes = [node] + [mot_codec.Node.empty(i) for i in range(1, 10)]
+    return mot_codec.MotFile([mot_codec.Section.from_nodes(0x0A, nodes, True, 8)])
+
+
+@unittest.skipIf(mot_npz is None, "numpy not installed")
+class NpzRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def files(self):
+        data = synthetic_mot(seed=9).serialize()
+        last = mot_codec.MotFile.parse(data).sections[-1].nodes[-1].tracks[-1]
+        yield "synthetic", data
+        yield "truncated", data[:last.offset + mot_codec.TRACK_HEADER.size + 5]
+        yield "float_frames", float_frame_mot().serialize()
+
+    def test_roundtrip(self):
+        for name, data in self.files():
+            for target in ("a.npz", "a_npy"):
+                with self.subTest(file=name, target=target):
+                    path = os.path.join(self.tmp, name + "_" + target)
+                    mot_npz.save_arrays(mot_npz.mot_to_arrays(mot_codec.MotFile.parse(data)), path)
+                    arrays = mot_npz.load_arrays(path)
+                    try:
+                        self.assertEqual(mot_npz.arrays_to_mot(arrays).serialize(), data)
+                    finally:
+                        if hasattr(arrays, "close"):
+                            arrays.close()
+
+    def test_float_frames_kept(self):
+        arrays = mot_npz.mot_to_arrays(mot_codec.MotFile.parse(float_frame_mot().serialize()))
+        self.assertEqual(arrays["Node0.ROT_X.frame"].dtype.str, "<f4")
+        self.assertEqual(arrays["Node0.ROT_X.frame"].tolist(), [0.0, 2.5, 7.75])
+        self.assertEqual(arrays["Node0.ROT_Z.frame"].dtype.str, "<i2")
+
+
+if __name__ == "__main__":
+    unittest.main()
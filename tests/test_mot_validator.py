@@ -0,0 +1,83 @@
+"""
+Mot_Validator on synthetic .mot files (no bpy): a valid file passes, a
+truncated or corrupted one is reported, never crashed on.
+
+Run: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import Mot_Validator
+from motbreak import mot_codec
+from test_mot_codec import synthetic_mot
+
+
+class ValidatorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.mot = synthetic_mot(seed=5)
+        self.data = self.mot.serialize()
+
+    def write(self, data, name="test.mot"):
+        path = os.path.join(self.tmp, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def codes(self, result, level="error"):
+        return {i["code"] for i in result["issues"] if i["level"] == level}
+
+    def test_valid_file(self):
+        result = Mot_Validator.validate_file(self.write(self.data))
+        self.assertTrue(result["ok"], result["issues"])
+        self.assertEqual(result["sections"], len(self.mot.sections))
+        self.assertEqual(result["nodes"], sum(len(s.nodes) for s in self.mot.sections))
+        tracks = [t for node in self.mot.nodes() for t in node.tracks]
+        self.assertEqual(result["tracks"], len(tracks))
+        self.assertEqual(result["keys"], sum(t.t_keys for t in tracks))
+        self.assertEqual(self.codes(result, "warning"), {"invalid_node"})
+
+    def test_truncated_files_are_reported(self):
+        # ogni taglio (header di sezione, nodo, track e key a metà) viene
+        # segnalato, mai un'eccezione. Tagliato a fine sezione è un file
+        # valido più corto; meno di un header dopo è solo trailing_bytes.
+        ends, offset = [], 0
+        for section in self.mot.sections:
+            offset += len(section.serialize())
+            ends.append(offset)
+        for size in range(0, len(self.data), 7):
+            if size in ends:
+                continue
+            with self.subTest(size=size):
+                result = Mot_Validator.validate_file(self.write(self.data[:size]))
+                if any(0 < size - end < mot_codec.SECTION_HEADER.size for end in ends):
+                    self.assertEqual(self.codes(result, "warning") - {"invalid_node"}, {"trailing_bytes"})
+                else:
+                    self.assertFalse(result["ok"])
+
+    def test_frames_not_monotonic(self):
+        track = next(t for node in mot_codec.MotFile.parse(self.data).nodes() for t in node.tracks
+                     if t.format_type == mot_codec.FORMAT_HERMITE_16 and t.t_keys > 1)
+        data = bytearray(self.data)
+        # frame della prima key (<hhhh: value, frame, c0, c1) oltre quello della seconda
+        struct.pack_into("<h", data, track.offset + mot_codec.TRACK_HEADER.size + 2, 1000)
+        result = Mot_Validator.validate_file(self.write(bytes(data)))
+        self.assertIn("frames_not_monotonic", self.codes(result))
+
+    def test_missing_file_and_many(self):
+        files = [self.write(self.data, "a.mot"), self.write(self.data[:100], "b.mot"), os.path.join(self.tmp, "missing.mot")]
+        results = Mot_Validator.validate_many(files, jobs=1)
+        self.assertEqual([r["ok"] for r in results], [True, False, False])
+        self.assertIn("io_error", self.codes(results[2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Regression test for mot_codec.tangent_handles (no bpy).
+
+The importer used to set the handles key by key after keyframe_insert:
+
+    handle_left  = (kf.co[0] - 1, kf.co[1] - c0 / div)
+    handle_right = (kf.co[0] + 1, kf.co[1] + c1 / div)
+
+with kf.co stored by Blender as float32. The vectorised handles must land
+on exactly the same float32 values for every key format and for the
+face nodes, whose location precision is negative.
+
+Run: python -m pytest tests   (or python -m unittest discover tests)
+"""
+import os
+import random
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motbreak import mot_codec
+
+
+def f32(x):
+    return struct.unpack("<f", struct.pack("<f", x))[0]
+
+
+def per_key_handles(keys, div):
+    """Formula dell'importer prima della versione vettoriale (delta_x = 1)."""
+    left, right = [], []
+    for frame, value, c0, c1 in keys.rows():
+        co = (f32(frame), f32(value))
+        left.append((f32(co[0] - 1.0), f32(co[1] - (c0 * 1.0) / div)))
+        right.append((f32(co[0] + 1.0), f32(co[1] + (c1 * 1.0) / div)))
+    return left, right
+
+
+def as_f32_pairs(handles):
+    return [(f32(x), f32(y)) for x, y in (tuple(h) for h in handles)]
+
+
+def make_track(track_id, format_type, n_keys, seed):
+    rnd = random.Random(seed)
+    keys = []
+    for frame in range(0, n_keys * 3, 3):
+        if format_type == mot_codec.FORMAT_HERMITE_FLOAT:
+            keys.append((rnd.uniform(-200.0, 200.0), float(frame), rnd.uniform(-5000.0, 5000.0), rnd.uniform(-5000.0, 5000.0)))
+        elif format_type == mot_codec.FORMAT_HERMITE_16:
+            keys.append((rnd.randint(-32768, 32767), frame, rnd.randint(-32768, 32767), rnd.randint(-32768, 32767)))
+        else:
+            keys.append((rnd.randint(-32768, 32767), frame))
+    return mot_codec.Track.from_keys(track_id, format_type, keys)
+
+
+# (nodo, track_id): rotazione, location e scala di un nodo del corpo più
+# le location facciali con precisione negativa (Node23/25/27: -256, Node24/26: -512)
+CHANNELS = [
+    (3, 0x008), (3, 0x040), (3, 0x002),
+    (23, 0x040), (24, 0x080), (25, 0x100), (26, 0x040), (27, 0x080),
+    (24, 0x010),
+]
+FORMATS = (mot_codec.FORMAT_LINEAR_16, mot_codec.FORMAT_HERMITE_16, mot_codec.FORMAT_HERMITE_FLOAT)
+
+
+class TangentHandlesTest(unittest.TestCase):
+    def check(self):
+        for n, (node, track_id) in enumerate(CHANNELS):
+            for format_type in FORMATS:
+                with self.subTest(node=node, track_id=hex(track_id), format=hex(format_type)):
+                    div = mot_codec.track_precision(node, mot_codec.TRACK_TYPES[track_id][1])
+                    keys = mot_codec.decode_track(make_track(track_id, format_type, 40, n * 10 + format_type), div)
+                    left, right = mot_codec.tangent_handles(keys.frames, keys.values, keys.c0, keys.c1, div)
+                    exp_left, exp_right = per_key_handles(keys, div)
+                    self.assertEqual(as_f32_pairs(left), exp_left)
+                    self.assertEqual(as_f32_pairs(right), exp_right)
+
+    def test_face_precision_is_negative(self):
+        for node in range(23, 28):
+            self.assertLess(mot_codec.track_precision(node, "location"), 0)
+
+    @unittest.skipIf(mot_codec.np is None, "numpy not installed")
+    def test_numpy(self):
+        self.check()
+
+    def test_pure_python(self):
+        np = mot_codec.np
+        mot_codec.np = None
+        try:
+            self.check()
+        finally:
+            mot_codec.np = np
+
+
+if __name__ == "__main__":
+    unittest.main()